@@ -0,0 +1,347 @@
+"""
+Autenticação do sistema: credenciais com hash salgado (PBKDF2 ou scrypt),
+cache das credenciais lidas e das verificações, comparação em tempo
+constante e limite de tentativas por cliente (token bucket).
+
+Pode ser usado tanto pelo terminal (main.py) quanto por futuras interfaces
+em rede, por isso é seguro para uso com várias threads.
+
+Formato do arquivo de login (uma linha):
+    algoritmo;parametros;sal;hash_usuario;hash_senha
+por exemplo:
+    pbkdf2_sha256;200000;<sal hex>;<hash hex>;<hash hex>
+    scrypt;16384:8:1;<sal hex>;<hash hex>;<hash hex>
+O formato antigo (sha256(usuario);sha256(senha)) continua aceito e é
+convertido para o formato novo no primeiro login bem-sucedido.
+"""
+import os
+import hmac
+import time
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+
+ALGORITMO_PADRAO = "pbkdf2_sha256"
+PBKDF2_ITERACOES = 200_000
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+# Memória máxima (bytes) que um custo de scrypt lido do arquivo pode exigir
+SCRYPT_MEMORIA_MAX = 2 ** 30
+TAMANHO_SAL = 16
+
+# Token bucket: cada cliente pode fazer até CAPACIDADE_BALDE tentativas seguidas,
+# e ganha uma nova tentativa a cada 1 / RECARGA_POR_SEGUNDO segundos
+CAPACIDADE_BALDE = 5
+RECARGA_POR_SEGUNDO = 0.2
+
+# Quantidade máxima de verificações guardadas no cache
+VERIFICACOES_CACHE_MAX = 1024
+
+# Quantidade máxima de clientes com balde guardado em memória
+BALDES_MAX = 4096
+
+AUTENTICADO = "autenticado"
+NEGADO = "negado"
+LIMITADO = "limitado"
+
+_trava = threading.Lock()
+
+# caminho -> (identificação do arquivo via os.stat, credenciais interpretadas)
+_cache_credenciais = {}
+
+# As chaves do cache de verificações são HMACs com uma chave sorteada a cada
+# execução, para que usuário e senha nunca fiquem em memória em texto claro.
+# Só logins bem-sucedidos entram no cache: se as falhas também entrassem, o
+# tempo de resposta revelaria quais senhas erradas já foram testadas.
+_CHAVE_CACHE = secrets.token_bytes(32)
+_cache_verificacoes = OrderedDict()
+
+# cliente -> [tentativas disponíveis, instante da última recarga],
+# do cliente usado há mais tempo para o mais recente
+_baldes = OrderedDict()
+
+
+# ============================================================
+# HASH DAS CREDENCIAIS
+# ============================================================
+
+def _hash_legado(texto: str) -> str:
+    """SHA-256 sem sal, usado pelo formato antigo do arquivo de login."""
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def derivar(texto: str, algoritmo: str, parametros: str, sal: bytes) -> str:
+    """Deriva o hash (hex) de um texto com o algoritmo e o custo informados."""
+    if algoritmo == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", texto.encode(), sal, int(parametros)).hex()
+    if algoritmo == "scrypt":
+        n, r, p = (int(v) for v in parametros.split(":"))
+        return hashlib.scrypt(texto.encode(), salt=sal, n=n, r=r, p=p,
+                              maxmem=256 * n * r + 1024 * 1024).hex()
+    raise ValueError(f"Algoritmo de hash desconhecido: {algoritmo}")
+
+
+def parametros_padrao(algoritmo: str) -> str:
+    """Retorna o custo configurado para o algoritmo, no formato do arquivo."""
+    if algoritmo == "pbkdf2_sha256":
+        return str(PBKDF2_ITERACOES)
+    if algoritmo == "scrypt":
+        return f"{SCRYPT_N}:{SCRYPT_R}:{SCRYPT_P}"
+    raise ValueError(f"Algoritmo de hash desconhecido: {algoritmo}")
+
+
+def tamanho_hash(algoritmo: str) -> int:
+    """Quantidade de dígitos hex do hash gerado por cada algoritmo."""
+    if algoritmo in ("sha256", "pbkdf2_sha256"):
+        return 64
+    if algoritmo == "scrypt":
+        return 128  # hashlib.scrypt gera 64 bytes por padrão
+    raise ValueError(f"Algoritmo de hash desconhecido: {algoritmo}")
+
+
+def parametros_validos(algoritmo: str, parametros: str) -> bool:
+    """Confere se o custo lido do arquivo pode ser usado pelo algoritmo."""
+    try:
+        if algoritmo == "pbkdf2_sha256":
+            return parametros.isdigit() and int(parametros) > 0
+        if algoritmo == "scrypt":
+            partes = parametros.split(":")
+            if len(partes) != 3 or not all(p.isdigit() for p in partes):
+                return False
+            n, r, p = (int(v) for v in partes)
+            return (n > 1 and n & (n - 1) == 0 and r > 0 and p > 0
+                    and 128 * n * r <= SCRYPT_MEMORIA_MAX)
+    except ValueError:
+        return False
+    return False
+
+
+def _hash_valido(texto: str, algoritmo: str) -> bool:
+    """True se o texto é hex minúsculo com o tamanho do hash do algoritmo."""
+    return (len(texto) == tamanho_hash(algoritmo)
+            and all(c in "0123456789abcdef" for c in texto))
+
+
+def gerar_credenciais(usuario: str, senha: str, algoritmo: str = ALGORITMO_PADRAO,
+                      parametros: str = None) -> str:
+    """Gera a linha do arquivo de login com um sal novo."""
+    if parametros is None:
+        parametros = parametros_padrao(algoritmo)
+    sal = secrets.token_bytes(TAMANHO_SAL)
+    return ";".join([
+        algoritmo,
+        parametros,
+        sal.hex(),
+        derivar(usuario, algoritmo, parametros, sal),
+        derivar(senha, algoritmo, parametros, sal)
+    ])
+
+
+def interpretar_credenciais(conteudo: str):
+    """
+    Interpreta o conteúdo do arquivo de login. Retorna um dicionário com
+    algoritmo, parametros, sal, usuario e senha (hashes), ou None se inválido
+    (algoritmo desconhecido, custo ilegível ou hashes que não são hex do
+    tamanho esperado).
+    """
+    partes = conteudo.strip().split(";")
+
+    if len(partes) == 2:
+        if not all(_hash_valido(p, "sha256") for p in partes):
+            return None
+        return {"algoritmo": "sha256", "parametros": "", "sal": b"",
+                "usuario": partes[0], "senha": partes[1]}
+
+    if len(partes) != 5:
+        return None
+    algoritmo, parametros, sal_hex, usuario_hash, senha_hash = partes
+    if algoritmo not in ("pbkdf2_sha256", "scrypt"):
+        return None
+    if not parametros_validos(algoritmo, parametros):
+        return None
+    if not (_hash_valido(usuario_hash, algoritmo) and _hash_valido(senha_hash, algoritmo)):
+        return None
+    try:
+        sal = bytes.fromhex(sal_hex)
+    except ValueError:
+        return None
+    return {"algoritmo": algoritmo, "parametros": parametros, "sal": sal,
+            "usuario": usuario_hash, "senha": senha_hash}
+
+
+# ============================================================
+# ARQUIVO DE CREDENCIAIS (COM CACHE)
+# ============================================================
+
+def _assinatura_arquivo(caminho: str):
+    """Identifica a versão do arquivo pelo instante de modificação e tamanho."""
+    info = os.stat(caminho)
+    return info.st_mtime_ns, info.st_size, info.st_ino
+
+
+def carregar_credenciais(caminho: str):
+    """
+    Retorna as credenciais interpretadas do arquivo (ou None se ausente/inválido).
+    O arquivo só é relido quando muda no disco.
+    """
+    try:
+        assinatura = _assinatura_arquivo(caminho)
+    except OSError:
+        return None
+
+    with _trava:
+        guardado = _cache_credenciais.get(caminho)
+        if guardado is not None and guardado[0] == assinatura:
+            return guardado[1]
+
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            credenciais = interpretar_credenciais(f.read())
+    except OSError:
+        return None
+
+    with _trava:
+        _cache_credenciais[caminho] = (assinatura, credenciais)
+    return credenciais
+
+
+def credenciais_validas(caminho: str) -> bool:
+    """True se o arquivo de login existe e está em um formato reconhecido."""
+    return carregar_credenciais(caminho) is not None
+
+
+def invalidar_caches(caminho: str = None):
+    """Descarta as credenciais e verificações guardadas (de um arquivo ou de todos)."""
+    with _trava:
+        if caminho is None:
+            _cache_credenciais.clear()
+        else:
+            _cache_credenciais.pop(caminho, None)
+        _cache_verificacoes.clear()
+
+
+def salvar_credenciais(caminho: str, usuario: str, senha: str,
+                       algoritmo: str = ALGORITMO_PADRAO, parametros: str = None):
+    """Grava novas credenciais (arquivo temporário + troca atômica)."""
+    linha = gerar_credenciais(usuario, senha, algoritmo, parametros)
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(linha)
+    os.replace(temporario, caminho)
+    invalidar_caches(caminho)
+
+
+# ============================================================
+# VERIFICAÇÃO E LIMITE DE TENTATIVAS
+# ============================================================
+
+def _chave_verificacao(caminho: str, assinatura, usuario: str, senha: str) -> bytes:
+    mensagem = "\0".join([caminho, repr(assinatura), usuario, senha]).encode()
+    return hmac.new(_CHAVE_CACHE, mensagem, hashlib.sha256).digest()
+
+
+def verificar_login(usuario: str, senha: str, caminho: str) -> bool:
+    """
+    Confere usuário e senha com o arquivo de login. Os hashes são comparados
+    em tempo constante (hmac.compare_digest) e um login válido fica em cache
+    até o arquivo mudar, evitando refazer a derivação cara. Tentativas
+    inválidas sempre refazem a derivação.
+    """
+    credenciais = carregar_credenciais(caminho)
+    if credenciais is None:
+        return False
+
+    try:
+        assinatura = _assinatura_arquivo(caminho)
+    except OSError:
+        return False
+    chave = _chave_verificacao(caminho, assinatura, usuario, senha)
+
+    with _trava:
+        if chave in _cache_verificacoes:
+            _cache_verificacoes.move_to_end(chave)
+            return True
+
+    if credenciais["algoritmo"] == "sha256":
+        usuario_hash = _hash_legado(usuario)
+        senha_hash = _hash_legado(senha)
+    else:
+        usuario_hash = derivar(usuario, credenciais["algoritmo"],
+                               credenciais["parametros"], credenciais["sal"])
+        senha_hash = derivar(senha, credenciais["algoritmo"],
+                             credenciais["parametros"], credenciais["sal"])
+
+    # As duas comparações são sempre feitas, para não revelar qual campo errou
+    usuario_ok = hmac.compare_digest(usuario_hash, credenciais["usuario"])
+    senha_ok = hmac.compare_digest(senha_hash, credenciais["senha"])
+    valido = usuario_ok & senha_ok
+
+    if not valido:
+        return False
+    if credenciais["algoritmo"] == "sha256":
+        salvar_credenciais(caminho, usuario, senha)  # migra o formato antigo
+        return True
+
+    with _trava:
+        _cache_verificacoes[chave] = True
+        while len(_cache_verificacoes) > VERIFICACOES_CACHE_MAX:
+            _cache_verificacoes.popitem(last=False)
+    return True
+
+
+def _descartar_baldes(agora: float):
+    """
+    Remove, a partir dos clientes usados há mais tempo, os baldes que já se
+    recarregaram por completo (equivalem a um balde novo) e os que não cabem em
+    BALDES_MAX. Chamar com _trava adquirida.
+    """
+    while _baldes:
+        cliente, (tentativas, instante) = next(iter(_baldes.items()))
+        cheio = tentativas + (agora - instante) * RECARGA_POR_SEGUNDO >= CAPACIDADE_BALDE
+        if not cheio and len(_baldes) < BALDES_MAX:
+            break
+        del _baldes[cliente]
+
+
+def _recarregar_balde(cliente: str, agora: float):
+    """Atualiza as tentativas disponíveis do cliente. Chamar com _trava adquirida."""
+    _descartar_baldes(agora)
+    balde = _baldes.get(cliente)
+    if balde is None:
+        balde = _baldes[cliente] = [float(CAPACIDADE_BALDE), agora]
+    else:
+        balde[0] = min(CAPACIDADE_BALDE, balde[0] + (agora - balde[1]) * RECARGA_POR_SEGUNDO)
+        balde[1] = agora
+        _baldes.move_to_end(cliente)
+    return balde
+
+
+def permitir_tentativa(cliente: str) -> bool:
+    """Consome uma tentativa do cliente; False se ele já esgotou o limite."""
+    with _trava:
+        balde = _recarregar_balde(cliente, time.monotonic())
+        if balde[0] >= 1:
+            balde[0] -= 1
+            return True
+        return False
+
+
+def espera_para_tentar(cliente: str) -> float:
+    """Segundos até o cliente ter uma nova tentativa disponível."""
+    with _trava:
+        balde = _recarregar_balde(cliente, time.monotonic())
+        if balde[0] >= 1:
+            return 0.0
+        return (1 - balde[0]) / RECARGA_POR_SEGUNDO
+
+
+def autenticar(usuario: str, senha: str, caminho: str, cliente: str = "local") -> str:
+    """
+    Fluxo completo de login para um cliente (terminal, endereço IP etc.).
+    Retorna AUTENTICADO, NEGADO ou LIMITADO (tentativas esgotadas).
+    """
+    if not permitir_tentativa(cliente):
+        return LIMITADO
+    return AUTENTICADO if verificar_login(usuario, senha, caminho) else NEGADO
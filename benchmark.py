@@ -0,0 +1,172 @@
+"""
+Benchmark do sistema de inventário.
+
+Gera dados sintéticos em uma pasta temporária (os arquivos do projeto não
+são tocados) e mede os tempos das operações principais.
+
+Uso: python benchmark.py [quantidade_de_produtos]
+"""
+import os
+import sys
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import main as sistema
+import autenticacao
+
+
+def cronometrar(funcao, *args, repeticoes: int = 1):
+    """Executa a função 'repeticoes' vezes e retorna (último resultado, melhor tempo em s)."""
+    melhor = None
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        duracao = time.perf_counter() - inicio
+        if melhor is None or duracao < melhor:
+            melhor = duracao
+    return resultado, melhor
+
+
+def gerar_dados(n_produtos: int):
+    """Cria inventário, cardápio e pedidos sintéticos."""
+    itens = {
+        i: {
+            "nome": f"Produto {i}",
+            "quantidade": (i * 7) % 500,
+            "preco": round(1 + (i % 90) * 0.35, 2),
+            "importado": i % 3 == 0
+        }
+        for i in range(1, n_produtos + 1)
+    }
+    n_pratos = max(1, n_produtos // 20)
+    cardapio = {
+        str(c): {
+            "nome": f"Prato {c}",
+            "preco": 10.0 + c % 40,
+            "ingredientes": [f"Produto {(c * k) % n_produtos + 1}" for k in range(1, 5)]
+        }
+        for c in range(1, n_pratos + 1)
+    }
+    pedidos = [
+        {
+            "id": i,
+            "prato": f"Prato {i % n_pratos + 1}",
+            "quantidade": 1 + i % 4,
+            "total": 25.0 * (1 + i % 4),
+            "horario": f"2026-01-01T12:{i % 60:02d}:00"
+        }
+        for i in range(1, n_produtos + 1)
+    ]
+    return itens, cardapio, pedidos
+
+
+def carregar_texto(caminhos):
+    """Carga tradicional: CSV cifrado + JSON."""
+    return (sistema.ler_inventario(caminhos["inventario"], paralelo=False),
+            sistema.carregar_cardapio(caminhos["cardapio"]),
+            sistema.carregar_pedidos(caminhos["pedidos"]))
+
+
+def primeira_consulta_mmap(caminho, identif):
+    """Abre o snapshot via mmap e busca um produto, sem decodificar o resto."""
+    snap = sistema.abrir_snapshot(caminho)
+    try:
+        return sistema.buscar_produto_snapshot(snap, identif)
+    finally:
+        sistema.fechar_snapshot(snap)
+
+
+def benchmark_inicializacao(n_produtos: int):
+    """Compara a carga a frio pelos arquivos de texto e pelo snapshot binário."""
+    itens, cardapio, pedidos = gerar_dados(n_produtos)
+    caminhos = sistema.caminhos_loja(sistema.LOJA_PRINCIPAL)
+
+    sistema.salvar_inventario(caminhos["inventario"], itens)
+    sistema.salvar_cardapio(cardapio, caminhos["cardapio"])
+    sistema.salvar_pedidos(pedidos, caminhos["pedidos"])
+    sistema.salvar_snapshot(caminhos["snapshot"], itens, cardapio, pedidos)
+
+    texto, t_texto = cronometrar(carregar_texto, caminhos, repeticoes=3)
+    binario, t_snapshot = cronometrar(sistema.carregar_snapshot, caminhos["snapshot"], repeticoes=3)
+    _, t_consulta = cronometrar(primeira_consulta_mmap, caminhos["snapshot"],
+                                n_produtos // 2, repeticoes=3)
+
+    assert texto[0] == binario[0] and texto[2] == binario[2], "snapshot divergente do CSV/JSON"
+
+    tam_texto = sum(os.path.getsize(caminhos[c]) for c in ("inventario", "cardapio", "pedidos"))
+    print(f"\n=== Inicialização ({n_produtos} produtos) ===")
+    print(f"CSV + JSON:                 {t_texto * 1000:9.1f} ms  ({tam_texto / 1024:.0f} KiB)")
+    print(f"Snapshot binário:           {t_snapshot * 1000:9.1f} ms  "
+          f"({os.path.getsize(caminhos['snapshot']) / 1024:.0f} KiB)")
+    print(f"1ª consulta via mmap:       {t_consulta * 1000:9.3f} ms")
+
+
+def benchmark_cache(n_produtos: int):
+    """Mede a ordenação do inventário e o faturamento com o cache frio e quente."""
+    itens, _, pedidos = gerar_dados(n_produtos)
+    sistema.inventario.clear()
+    sistema.inventario.update(itens)
+    sistema.marcar_alteracao("inventario")
+    sistema.limpar_cache()
+
+    _, t_frio = cronometrar(sistema.ordenar_inventario_por_nome)
+    _, t_quente = cronometrar(sistema.ordenar_inventario_por_nome, repeticoes=5)
+    _, t_fat_frio = cronometrar(sistema.faturamento_total, pedidos)
+    _, t_fat_quente = cronometrar(sistema.faturamento_total, pedidos, repeticoes=5)
+
+    est = sistema.estatisticas_cache()
+    print(f"\n=== Cache de consultas ({n_produtos} produtos) ===")
+    print(f"Ordenação por nome:  frio {t_frio * 1000:9.1f} ms | quente {t_quente * 1000:.4f} ms")
+    print(f"Faturamento total:   frio {t_fat_frio * 1000:9.1f} ms | quente {t_fat_quente * 1000:.4f} ms")
+    print(f"Acertos: {est['acertos']} | Faltas: {est['faltas']} | "
+          f"Memória: {est['bytes'] / 1024:.0f} KiB")
+
+
+def logins_por_segundo(tentativas, threads: int = 8):
+    """Dispara as tentativas (usuario, senha, cliente) em paralelo. Retorna (logins/s, resultados)."""
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        resultados = list(pool.map(
+            lambda t: autenticacao.autenticar(t[0], t[1], "login.txt", cliente=t[2]), tentativas))
+    return len(tentativas) / (time.perf_counter() - inicio), resultados
+
+
+def benchmark_login():
+    """Mede logins por segundo sob carga: sem cache, com cache e com um cliente abusivo."""
+    autenticacao.salvar_credenciais("login.txt", "admin", "segredo")
+
+    # Senhas diferentes: toda verificação refaz a derivação (PBKDF2)
+    frias = [("admin", f"senha{i}", f"cliente{i}") for i in range(40)]
+    taxa_fria, _ = logins_por_segundo(frias)
+
+    # Mesmas credenciais, clientes diferentes: verificações vêm do cache
+    quentes = [("admin", "segredo", f"cliente{i}") for i in range(20_000)]
+    taxa_quente, resultados = logins_por_segundo(quentes)
+    assert all(r == autenticacao.AUTENTICADO for r in resultados)
+
+    # Um único cliente insistindo: o token bucket barra quase tudo
+    abuso = [("admin", "chute", "atacante") for _ in range(20_000)]
+    taxa_abuso, resultados = logins_por_segundo(abuso)
+    barrados = resultados.count(autenticacao.LIMITADO)
+
+    print(f"\n=== Login ({autenticacao.ALGORITMO_PADRAO}, "
+          f"{autenticacao.parametros_padrao(autenticacao.ALGORITMO_PADRAO)}) ===")
+    print(f"Sem cache (senhas distintas):  {taxa_fria:12.1f} logins/s")
+    print(f"Com cache de verificação:      {taxa_quente:12.1f} logins/s")
+    print(f"Cliente limitado:              {taxa_abuso:12.1f} tentativas/s "
+          f"({barrados} de {len(abuso)} barradas)")
+
+
+def main():
+    n_produtos = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    with tempfile.TemporaryDirectory() as pasta:
+        os.chdir(pasta)
+        benchmark_inicializacao(n_produtos)
+        benchmark_cache(n_produtos)
+        benchmark_login()
+
+
+if __name__ == "__main__":
+    main()
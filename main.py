@@ -1,13 +1,52 @@
 import os
 import json
+import string
+import sys
 import datetime
-import hashlib
 import csv
+import heapq
+import itertools
+import bisect
+from array import array
+import time
+import mmap
+import struct
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import autenticacao
 
 ARQUIVO_LOGIN = "login.txt"
 ARQUIVO_INVENTARIO = "inventario.csv"
 CARDAPIO_FILE = "cardapio.json"
 PEDIDOS_FILE = "pedidos.json"
+ESTOQUE_MINIMO_FILE = "estoque_minimo.json"
+SNAPSHOT_FILE = "snapshot.bin"
+LOG_INVENTARIO_FILE = "inventario.log"
+MOVIMENTACOES_FILE = "movimentacoes.bin"
+LOJAS_DIR = "lojas"
+LOJA_PRINCIPAL = "principal"
+
+# Carga e gravação dos arquivos em paralelo (False = modo sequencial)
+IO_PARALELO = True
+# Inventários a partir deste tamanho (bytes) são decifrados em blocos por vários processos
+LIMIAR_INVENTARIO_PARALELO = 4 * 1024 * 1024
+LINHAS_POR_BLOCO = 50_000
+
+# Com True, a carga usa o snapshot binário (quando existir) no lugar do CSV/JSON,
+# e a gravação passa a gerar também o snapshot
+USAR_SNAPSHOT = False
+
+# Memória máxima (aproximada, em bytes) do cache de consultas
+CACHE_LIMITE_BYTES = 32 * 1024 * 1024
+
+# Log de alterações do inventário: fsync a cada N linhas ou T segundos,
+# e checkpoint (regravação do CSV) ao salvar quando o log passar do limite
+LOG_GRUPO_FSYNC = 16
+LOG_INTERVALO_FSYNC = 1.0
+LOG_LIMITE_CHECKPOINT = 500
 
 
 # CIFRA DE CÉSAR (CRIPTOGRAFIA DO INVENTÁRIO)
@@ -26,25 +65,27 @@ def decifrar(texto: str, shift: int = 3) -> str: # Decifra o texto
     return cifrar(texto, -shift)
 
 
-# SISTEMA DE LOGIN - Gabriel - (HASH SHA-256)
-def hash_sha256(texto: str) -> str: # Retorna o texto em hash-256
-    return hashlib.sha256(texto.encode()).hexdigest()
+# GRAVAÇÃO SEGURA DE ARQUIVOS (TEMPORÁRIO + TROCA ATÔMICA)
+def sincronizar_pasta(caminho: str): # fsync da pasta do arquivo, para a troca de nome chegar ao disco
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(caminho)), os.O_RDONLY)
+    except OSError:
+        return  # sistemas que não permitem abrir pastas (ex.: Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
+def substituir_arquivo(temporario: str, caminho: str): # Troca o arquivo pelo temporário já gravado e sincronizado
+    os.replace(temporario, caminho)
+    sincronizar_pasta(caminho)
 
-def arquivo_login_valido() -> bool: # Verificação da existência do arquivo login.txt e se contém os hashes para usuário e senha com 64 caracteres
-    if not os.path.exists(ARQUIVO_LOGIN):
-        return False
-    try:
-        with open(ARQUIVO_LOGIN, "r", encoding="utf-8") as f:
-            conteudo = f.read().strip()
-        if not conteudo:
-            return False
-        partes = conteudo.split(";")
-        if len(partes) != 2:
-            return False
-        return all(len(p) == 64 for p in partes)
-    except Exception:
-        return False
+
+# SISTEMA DE LOGIN - Gabriel - (HASH SALGADO, VER autenticacao.py)
+def arquivo_login_valido() -> bool: # Verificação da existência do arquivo login.txt e se contém credenciais em formato reconhecido
+    return autenticacao.credenciais_validas(ARQUIVO_LOGIN)
 
 
 def registrar_usuario_inicial(): #  Primeira execução: cria usuário e senha iniciais, salvando apenas os hashes.
@@ -52,28 +93,24 @@ def registrar_usuario_inicial(): #  Primeira execução: cria usuário e senha i
     usuario = input("Defina um nome de usuário: ").strip()
     senha = input("Defina uma senha: ").strip()
 
-    with open(ARQUIVO_LOGIN, "w", encoding="utf-8") as f:
-        f.write(f"{hash_sha256(usuario)};{hash_sha256(senha)}")
+    autenticacao.salvar_credenciais(ARQUIVO_LOGIN, usuario, senha)
 
     print("\n✔ Registro concluído! Reinicie o programa para fazer login.\n")
 
-def carregar_credenciais(): # Retorna os valores lidos
-    with open(ARQUIVO_LOGIN, "r", encoding="utf-8") as f:
-        usuario_hash, senha_hash = f.read().strip().split(";")
-    return usuario_hash, senha_hash
-
-def login() -> bool: # login com até 3 tentativas
-    usuario_hash, senha_hash = carregar_credenciais()
-
+def login() -> bool: # login com até 3 tentativas, limitado por cliente (token bucket)
     for tentativa in range(3):
         print("\n=== LOGIN ===")
         usuario_input = input("Usuário: ").strip()
         senha_input = input("Senha: ").strip()
 
-        if (hash_sha256(usuario_input) == usuario_hash and
-                hash_sha256(senha_input) == senha_hash):
+        resultado = autenticacao.autenticar(usuario_input, senha_input,
+                                            ARQUIVO_LOGIN, cliente="terminal")
+        if resultado == autenticacao.AUTENTICADO:
             print("\n✔ Login bem-sucedido!")
             return True
+        elif resultado == autenticacao.LIMITADO:
+            espera = autenticacao.espera_para_tentar("terminal")
+            print(f"\n⏳ Muitas tentativas. Aguarde {espera:.0f} segundo(s).")
         else:
             print("\n✘ Usuário ou senha incorretos!")
             restantes = 2 - tentativa
@@ -88,8 +125,7 @@ def editar_usuario_senha(): # Alterar usuário e senha cadastrados
     usuario = input("Novo usuário: ").strip()
     senha = input("Nova senha: ").strip()
 
-    with open(ARQUIVO_LOGIN, "w", encoding="utf-8") as f:
-        f.write(f"{hash_sha256(usuario)};{hash_sha256(senha)}") # Escreve as alterações em hash
+    autenticacao.salvar_credenciais(ARQUIVO_LOGIN, usuario, senha) # Escreve as alterações em hash salgado
 
     print("\n✔ Credenciais atualizadas com sucesso!\n")
 
@@ -124,6 +160,8 @@ def adicionar_produto(identif: int, nome: str, quantidade: int,
         "preco": preco,
         "importado": importado
     }
+    _registrar_produto_no_log(identif)
+    _ao_alterar_estoque(identif, 0, "cadastro")
     print(f"✔ Produto '{nome}' adicionado com sucesso.")
     return True
 
@@ -131,7 +169,13 @@ def adicionar_produto(identif: int, nome: str, quantidade: int,
 def remover_produto(identif: int) -> bool:
     """Remove um produto do inventário pelo ID."""
     if identif in inventario:
+        invalidar_porcoes_ingrediente(inventario[identif]["nome"])
+        registrar_movimentacao(identif, -inventario[identif]["quantidade"], "remocao")
         del inventario[identif]
+        _registrar_produto_no_log(identif)
+        marcar_alteracao("inventario")
+        estoque_minimo.pop(identif, None)
+        _atualizar_fila_reposicao(identif)
         print("✔ Produto removido com sucesso.")
         return True
     print("❌ ID não encontrado no inventário.")
@@ -149,8 +193,11 @@ def atualizar_produto(identif: int,
         return False
 
     dados = inventario[identif]
+    quantidade_anterior = dados["quantidade"]
 
     if nome is not None:
+        invalidar_porcoes_ingrediente(dados["nome"])
+        invalidar_porcoes_ingrediente(nome)
         dados["nome"] = nome
     if quantidade is not None:
         dados["quantidade"] = quantidade
@@ -159,10 +206,33 @@ def atualizar_produto(identif: int,
     if importado is not None:
         dados["importado"] = importado
 
+    _registrar_produto_no_log(identif)
+    marcar_alteracao("inventario")
+    if quantidade is not None:
+        motivo = "reposicao" if quantidade > quantidade_anterior else "ajuste"
+        _ao_alterar_estoque(identif, quantidade_anterior, motivo)
+
     print("✔ Produto atualizado com sucesso.")
     return True
 
 
+def repor_produto(identif: int, quantidade: int) -> bool:
+    """Soma 'quantidade' ao estoque de um produto (entrada de mercadoria)."""
+    if identif not in inventario:
+        print("❌ Produto não encontrado.")
+        return False
+    if quantidade <= 0:
+        print("❌ A quantidade reposta deve ser positiva.")
+        return False
+
+    quantidade_anterior = inventario[identif]["quantidade"]
+    inventario[identif]["quantidade"] += quantidade
+    registrar_no_log("Q", identif, inventario[identif]["quantidade"])
+    _ao_alterar_estoque(identif, quantidade_anterior, "reposicao")
+    print("✔ Estoque reposto com sucesso.")
+    return True
+
+
 def listar_itens_ordenados():
     """Lista o inventário ordenado por nome do produto (usando sort customizado)."""
     lista_ordenada = ordenar_inventario_por_nome()
@@ -200,6 +270,17 @@ def encontrar_id_por_nome(nome: str):
     return None
 
 
+def mapa_ids_por_nome() -> dict:
+    """
+    Retorna {nome (minúsculo): ID do primeiro produto com esse nome}, para
+    consultas em lote sem percorrer o inventário a cada nome.
+    """
+    ids = {}
+    for identif, dados in inventario.items():
+        ids.setdefault(dados["nome"].lower(), identif)
+    return ids
+
+
 def estatisticas_inventario():
     """Exibe quantidade de produtos e valor total do estoque."""
     total_produtos = len(inventario)
@@ -213,47 +294,80 @@ def estatisticas_inventario():
     print("======================================\n")
 
 
-def carregar_inventario(caminho: str = ARQUIVO_INVENTARIO):
-    """Carrega o inventário cifrado do arquivo CSV para o dicionário em memória."""
-    global inventario
+def _decifrar_linhas(linhas) -> dict:
+    """Decifra e interpreta linhas do CSV do inventário (também usada pelos processos do pool)."""
+    itens = {}
+    for linha in linhas:
+        linha = linha.strip()
+        if not linha:
+            continue
 
-    if not os.path.exists(caminho):
-        print("Arquivo de inventário não encontrado. Criando vazio...")
-        inventario = {}
-        return
+        partes = linha.split(";")
+        if len(partes) != 5:
+            continue  # linha inválida
 
-    inventario.clear()
+        id_dec = int(decifrar(partes[0]))
+        nome_dec = decifrar(partes[1])
+        qtd_dec = int(decifrar(partes[2]))
+        preco_dec = float(decifrar(partes[3]))
+        importado_dec = True if decifrar(partes[4]) == "True" else False
 
-    with open(caminho, "r", encoding="utf-8") as arquivo:
-        for linha in arquivo:
-            linha = linha.strip()
-            if not linha:
-                continue
+        itens[id_dec] = {
+            "nome": nome_dec,
+            "quantidade": qtd_dec,
+            "preco": preco_dec,
+            "importado": importado_dec
+        }
+    return itens
 
-            partes = linha.split(";")
-            if len(partes) != 5:
-                continue  # linha inválida
 
-            id_dec = int(decifrar(partes[0]))
-            nome_dec = decifrar(partes[1])
-            qtd_dec = int(decifrar(partes[2]))
-            preco_dec = float(decifrar(partes[3]))
-            importado_dec = True if decifrar(partes[4]) == "True" else False
-
-            inventario[id_dec] = {
-                "nome": nome_dec,
-                "quantidade": qtd_dec,
-                "preco": preco_dec,
-                "importado": importado_dec
-            }
+def contexto_processos():
+    """
+    Contexto dos pools de processos do sistema. "spawn" evita fazer fork de um
+    processo com threads de E/S em andamento (ver executar_tarefas_io).
+    """
+    return multiprocessing.get_context("spawn")
 
-    print("✔ Inventário carregado com sucesso.")
 
+def ler_inventario(caminho: str = ARQUIVO_INVENTARIO, paralelo: bool = None) -> dict:
+    """
+    Lê o inventário cifrado do CSV e retorna um novo dicionário (sem alterar o global).
+    Arquivos maiores que LIMIAR_INVENTARIO_PARALELO são divididos em blocos de
+    linhas decifrados por um pool de processos; os blocos são juntados em ordem.
+    """
+    if paralelo is None:
+        paralelo = IO_PARALELO
+    if not os.path.exists(caminho):
+        return {}
+
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        linhas = arquivo.readlines()
+
+    if (not paralelo or (os.cpu_count() or 1) < 2
+            or os.path.getsize(caminho) < LIMIAR_INVENTARIO_PARALELO):
+        return _decifrar_linhas(linhas)
 
-def salvar_inventario(caminho: str = ARQUIVO_INVENTARIO):
-    """Salva o inventário cifrado em CSV (processamento em lote)."""
+    blocos = [linhas[i:i + LINHAS_POR_BLOCO]
+              for i in range(0, len(linhas), LINHAS_POR_BLOCO)]
+    itens = {}
+    try:
+        with ProcessPoolExecutor(max_workers=min(len(blocos), os.cpu_count() or 1),
+                                 mp_context=contexto_processos()) as pool:
+            for parte in pool.map(_decifrar_linhas, blocos):
+                itens.update(parte)
+    except (OSError, RuntimeError) as e:
+        avisar(f"Processamento paralelo indisponível ({e}). Decifrando em série...")
+        itens = _decifrar_linhas(linhas)
+    return itens
+
+
+def salvar_inventario(caminho: str = ARQUIVO_INVENTARIO, itens: dict = None):
+    """Salva o inventário cifrado em CSV (processamento em lote).
+    Por padrão salva o inventário em memória; 'itens' permite salvar outro dicionário."""
+    if itens is None:
+        itens = inventario
     with open(caminho, "w", encoding="utf-8") as arquivo:
-        for identif, dados in inventario.items():
+        for identif, dados in itens.items():
             linha = ";".join([
                 cifrar(str(identif)),
                 cifrar(dados["nome"]),
@@ -263,7 +377,708 @@ def salvar_inventario(caminho: str = ARQUIVO_INVENTARIO):
             ])
             arquivo.write(linha + "\n")
 
-    print("✔ Inventário salvo em disco.")
+    avisar("✔ Inventário salvo em disco.")
+
+
+# ============================================================
+# LOG DE ALTERAÇÕES DO INVENTÁRIO (WRITE-AHEAD LOG)
+# ============================================================
+
+# Cada alteração do inventário vira uma linha no fim de inventario.log,
+# cifrada como o CSV:
+#   P;id;nome;quantidade;preco;importado  -> produto incluído ou atualizado
+#   Q;id;quantidade                       -> nova quantidade (baixa de estoque)
+#   R;id                                  -> produto removido
+# As linhas guardam valores absolutos (e não diferenças), então reaplicar o log
+# sobre um inventário que já contém parte dele dá o mesmo resultado.
+#
+# Cada linha é entregue ao sistema operacional na hora (flush); o fsync, que é
+# o passo caro, é feito em grupo a cada LOG_GRUPO_FSYNC linhas ou
+# LOG_INTERVALO_FSYNC segundos. Na carga, o CSV (ou o snapshot) é lido e o log
+# é reaplicado por cima. O checkpoint grava o CSV completo e esvazia o log.
+#
+# Estrutura de um log aberto:
+# { "caminho": str, "arquivo": arquivo aberto, "entradas": int,
+#   "pendentes": int (linhas ainda sem fsync), "ultimo_fsync": float }
+
+
+def abrir_log_inventario(caminho: str, entradas: int = 0) -> dict:
+    """Abre (ou cria) o log para acrescentar linhas no final."""
+    if os.path.exists(caminho):
+        # Remove a linha incompleta deixada por uma queda, para que a próxima
+        # linha acrescentada não fique grudada nela
+        with open(caminho, "rb+") as arquivo:
+            arquivo.truncate(arquivo.read().rfind(b"\n") + 1)
+    return {
+        "caminho": caminho,
+        "arquivo": open(caminho, "a", encoding="utf-8"),
+        "entradas": entradas,
+        "pendentes": 0,
+        "ultimo_fsync": time.monotonic()
+    }
+
+
+def _log_ativo():
+    """Retorna o log da loja ativa, ou None se nenhuma loja foi carregada."""
+    estado = lojas.get(loja_atual)
+    return estado.get("log") if estado else None
+
+
+def sincronizar_log(log: dict):
+    """Garante que as linhas pendentes do log estão gravadas no disco (fsync)."""
+    if log["pendentes"]:
+        log["arquivo"].flush()
+        os.fsync(log["arquivo"].fileno())
+        log["pendentes"] = 0
+    log["ultimo_fsync"] = time.monotonic()
+
+
+def registrar_no_log(*campos):
+    """Acrescenta uma linha cifrada ao log da loja ativa."""
+    log = _log_ativo()
+    if log is None:
+        return
+
+    log["arquivo"].write(cifrar(";".join(str(c) for c in campos)) + "\n")
+    log["arquivo"].flush()
+    log["entradas"] += 1
+    log["pendentes"] += 1
+
+    if (log["pendentes"] >= LOG_GRUPO_FSYNC or
+            time.monotonic() - log["ultimo_fsync"] >= LOG_INTERVALO_FSYNC):
+        sincronizar_log(log)
+        sincronizar_historico(historico)  # o histórico acompanha o fsync do log
+
+
+def _registrar_produto_no_log(identif: int):
+    """Registra o estado atual do produto (P) ou a sua remoção (R)."""
+    if identif in inventario:
+        dados = inventario[identif]
+        registrar_no_log("P", identif, dados["nome"], dados["quantidade"],
+                         dados["preco"], dados["importado"])
+    else:
+        registrar_no_log("R", identif)
+
+
+def reproduzir_log(caminho: str, itens: dict, mostrar: bool = True) -> int:
+    """
+    Reaplica o log sobre o dicionário 'itens' e retorna quantas linhas foram
+    aplicadas. Uma última linha incompleta (queda durante a escrita) é ignorada.
+    """
+    if not os.path.exists(caminho):
+        return 0
+
+    # Lido em modo binário: uma queda pode cortar a última linha no meio de
+    # um caractere acentuado, e só as linhas completas devem ser decodificadas
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read()
+    completas = conteudo[:conteudo.rfind(b"\n") + 1]  # descarta a linha incompleta
+
+    aplicadas = 0
+    for bruta in completas.split(b"\n")[:-1]:
+        try:
+            partes = decifrar(bruta.decode("utf-8")).split(";")
+        except UnicodeDecodeError:
+            continue  # linha corrompida
+        try:
+            if partes[0] == "P" and len(partes) == 6:
+                itens[int(partes[1])] = {
+                    "nome": partes[2],
+                    "quantidade": int(partes[3]),
+                    "preco": float(partes[4]),
+                    "importado": partes[5] == "True"
+                }
+            elif partes[0] == "Q" and len(partes) == 3:
+                if int(partes[1]) in itens:
+                    itens[int(partes[1])]["quantidade"] = int(partes[2])
+            elif partes[0] == "R" and len(partes) == 2:
+                itens.pop(int(partes[1]), None)
+            else:
+                continue  # linha inválida
+        except ValueError:
+            continue
+        aplicadas += 1
+
+    if aplicadas and mostrar:
+        print(f"✔ {aplicadas} alteração(ões) do inventário recuperada(s) do log.")
+    return aplicadas
+
+
+def checkpoint_inventario(nome_loja: str = None):
+    """
+    Incorpora o log aos arquivos base: grava o inventário completo no CSV
+    (arquivo temporário sincronizado + troca atômica) e atualiza ou descarta
+    o snapshot. Só depois que todos estão no disco o log é esvaziado.
+    """
+    nome_loja = nome_loja or loja_atual
+    estado = lojas[nome_loja]
+    caminhos = caminhos_loja(nome_loja)
+    caminho = caminhos["inventario"]
+    log = estado["log"]
+
+    sincronizar_log(log)
+    temporario = caminho + ".tmp"
+    salvar_inventario(temporario, estado["inventario"])
+    with open(temporario, "rb+") as f:
+        os.fsync(f.fileno())
+    substituir_arquivo(temporario, caminho)
+    atualizar_snapshot_da_loja(nome_loja)
+
+    log["arquivo"].truncate(0)
+    log["arquivo"].flush()
+    os.fsync(log["arquivo"].fileno())
+    log["entradas"] = 0
+    avisar(f"✔ Checkpoint do inventário concluído ({caminho}).")
+
+
+def salvar_inventario_da_loja(nome_loja: str):
+    """
+    Ao salvar, o log já contém todas as alterações: basta sincronizá-lo.
+    O CSV só é regravado (checkpoint) quando o log passa de LOG_LIMITE_CHECKPOINT.
+    O snapshot é atualizado (ou descartado) aqui mesmo, depois do log, para
+    nunca correr em paralelo com um checkpoint que esvazia o log.
+    """
+    log = lojas[nome_loja]["log"]
+    if log["entradas"] >= LOG_LIMITE_CHECKPOINT:
+        checkpoint_inventario(nome_loja)
+    else:
+        sincronizar_log(log)
+        # O log guarda valores absolutos, então reaplicá-lo sobre este
+        # snapshot (que já o contém) não altera o resultado
+        atualizar_snapshot_da_loja(nome_loja)
+
+
+def atualizar_snapshot_da_loja(nome_loja: str):
+    """
+    Mantém o snapshot da loja em dia com os arquivos base. Com USAR_SNAPSHOT ele
+    é regravado; sem, um snapshot existente é apagado, pois o CSV/JSON e o log
+    seguem mudando sem ele e, se a opção voltar a ser ligada, a carga usaria
+    dados antigos.
+    """
+    estado = lojas[nome_loja]
+    caminho = caminhos_loja(nome_loja)["snapshot"]
+    if USAR_SNAPSHOT:
+        salvar_snapshot(caminho, estado["inventario"], estado["cardapio"], estado["pedidos"])
+    elif os.path.exists(caminho):
+        os.remove(caminho)
+        sincronizar_pasta(caminho)
+        avisar(f"✔ Snapshot desatualizado removido ({caminho}).")
+
+
+# ============================================================
+# ESTOQUE MÍNIMO E FILA DE REPOSIÇÃO (HEAP)
+# ============================================================
+
+# Estrutura:
+# estoque_minimo = { id (int): quantidade mínima (int) }
+#
+# fila_reposicao é um min-heap de entradas [folga, contador, id], onde
+# folga = quantidade - mínimo. Quanto menor a folga, mais urgente a reposição.
+# Ao alterar um produto a entrada antiga é apenas marcada como removida
+# (id = None) e uma nova é inserida, mantendo cada atualização em O(log N).
+# Entradas removidas são descartadas quando chegam ao topo do heap.
+
+estoque_minimo = {}
+fila_reposicao = []
+_entradas_reposicao = {}
+_contador_reposicao = itertools.count()
+
+
+def alerta_estoque_baixo(identif: int, dados: dict, minimo: int):
+    """Alerta padrão: avisa quando um produto atinge o estoque mínimo."""
+    print(f"⚠ Estoque baixo: '{dados['nome']}' (ID {identif}) "
+          f"com {dados['quantidade']} unidade(s), mínimo {minimo}.")
+
+
+_alertas_estoque = [alerta_estoque_baixo]
+
+
+def registrar_alerta_estoque(funcao):
+    """
+    Registra uma função chamada como funcao(id, dados, minimo) sempre que
+    um produto cruza o seu estoque mínimo (de acima para igual/abaixo).
+    """
+    _alertas_estoque.append(funcao)
+
+
+def _atualizar_fila_reposicao(identif: int):
+    """Invalida a entrada atual do produto no heap e insere a nova, se houver mínimo."""
+    entrada = _entradas_reposicao.pop(identif, None)
+    if entrada is not None:
+        entrada[-1] = None
+
+    if identif in inventario and identif in estoque_minimo:
+        folga = inventario[identif]["quantidade"] - estoque_minimo[identif]
+        entrada = [folga, next(_contador_reposicao), identif]
+        _entradas_reposicao[identif] = entrada
+        heapq.heappush(fila_reposicao, entrada)
+
+    # Compacta o heap quando há entradas removidas demais (custo amortizado)
+    if len(fila_reposicao) > 2 * len(_entradas_reposicao) + 32:
+        fila_reposicao[:] = [e for e in fila_reposicao if e[-1] is not None]
+        heapq.heapify(fila_reposicao)
+
+
+def _ao_alterar_estoque(identif: int, quantidade_anterior: int, motivo: str):
+    """
+    Deve ser chamada após qualquer mudança na quantidade de um produto.
+    Registra a movimentação no histórico, marca o inventário como alterado,
+    atualiza a fila de reposição, invalida as porções dos pratos que usam
+    o produto e dispara os alertas se o mínimo foi cruzado.
+    """
+    dados = inventario[identif]
+    registrar_movimentacao(identif, dados["quantidade"] - quantidade_anterior, motivo)
+    marcar_alteracao("inventario")
+    _atualizar_fila_reposicao(identif)
+    invalidar_porcoes_ingrediente(dados["nome"])
+
+    minimo = estoque_minimo.get(identif)
+    if minimo is None or motivo == "cadastro":
+        return
+
+    if quantidade_anterior > minimo >= dados["quantidade"]:
+        for funcao in _alertas_estoque:
+            funcao(identif, dados, minimo)
+
+
+def reconstruir_fila_reposicao():
+    """Recria o heap inteiro a partir do inventário (usado após carregar dados)."""
+    global fila_reposicao
+
+    for entrada in _entradas_reposicao.values():
+        entrada[-1] = None
+    _entradas_reposicao.clear()
+
+    fila_reposicao = []
+    for identif, minimo in estoque_minimo.items():
+        if identif in inventario:
+            folga = inventario[identif]["quantidade"] - minimo
+            entrada = [folga, next(_contador_reposicao), identif]
+            _entradas_reposicao[identif] = entrada
+            fila_reposicao.append(entrada)
+    heapq.heapify(fila_reposicao)
+
+
+def definir_estoque_minimo(identif: int, minimo) -> bool:
+    """Define (ou remove, se minimo for None) o estoque mínimo de um produto."""
+    if identif not in inventario:
+        print("❌ Produto não encontrado.")
+        return False
+
+    if minimo is None:
+        estoque_minimo.pop(identif, None)
+    else:
+        estoque_minimo[identif] = minimo
+    _atualizar_fila_reposicao(identif)
+    return True
+
+
+def produtos_para_repor():
+    """
+    Retorna os produtos com quantidade igual ou abaixo do mínimo,
+    do mais urgente para o menos urgente. Custa O(k log N) para k produtos.
+    """
+    resultado = []
+    retirados = []
+
+    while fila_reposicao:
+        entrada = fila_reposicao[0]
+        if entrada[-1] is None:
+            heapq.heappop(fila_reposicao)  # entrada antiga, descarta
+            continue
+        if entrada[0] > 0:
+            break
+
+        heapq.heappop(fila_reposicao)
+        retirados.append(entrada)
+        identif = entrada[-1]
+        resultado.append({
+            "id": identif,
+            "nome": inventario[identif]["nome"],
+            "quantidade": inventario[identif]["quantidade"],
+            "minimo": estoque_minimo[identif],
+            "repor": estoque_minimo[identif] - inventario[identif]["quantidade"]
+        })
+
+    for entrada in retirados:
+        heapq.heappush(fila_reposicao, entrada)
+
+    return resultado
+
+
+def relatorio_reposicao():
+    """Exibe os produtos que precisam de reposição."""
+    lista = produtos_para_repor()
+    if not lista:
+        print("\nNenhum produto abaixo do estoque mínimo.\n")
+        return
+
+    print("\n===== RELATÓRIO DE REPOSIÇÃO =====\n")
+    for item in lista:
+        print(
+            f"ID: {item['id']} | "
+            f"Nome: {item['nome']} | "
+            f"Qtd: {item['quantidade']} | "
+            f"Mínimo: {item['minimo']} | "
+            f"Repor ao menos: {item['repor']}"
+        )
+    print()
+
+
+def ler_estoque_minimo(caminho: str = ESTOQUE_MINIMO_FILE) -> dict:
+    """Lê os estoques mínimos do JSON e retorna um novo dicionário."""
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, "r", encoding="utf-8") as f:
+        return {int(identif): minimo for identif, minimo in json.load(f).items()}
+
+
+def salvar_estoque_minimo(caminho: str = ESTOQUE_MINIMO_FILE, minimos: dict = None):
+    """Salva os estoques mínimos em JSON."""
+    if minimos is None:
+        minimos = estoque_minimo
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump({str(k): v for k, v in minimos.items()}, f, indent=2)
+
+
+# ============================================================
+# HISTÓRICO DE MOVIMENTAÇÕES DE ESTOQUE (SÉRIE TEMPORAL)
+# ============================================================
+
+# Toda mudança de quantidade gera uma movimentação (produto, variação, motivo,
+# horário). O histórico é guardado em colunas por produto, com arrays
+# compactos que só recebem acréscimos no final:
+#
+# historico = {
+#   "colunas": {
+#       id (int): {
+#           "instante": array('d'),  # horário (time.time()), sempre crescente
+#           "delta": array('q'),     # variação da quantidade
+#           "motivo": array('B'),    # índice em MOTIVOS_MOVIMENTACAO
+#           "consumo": array('q')    # consumo acumulado (saídas por pedido ou ajuste)
+#       },
+#   },
+#   "arquivo": arquivo binário aberto para acréscimo, ou None
+# }
+#
+# Como os horários são crescentes, uma janela de tempo é localizada por busca
+# binária, e o consumo acumulado dá o consumo da janela com uma subtração:
+# cada consulta custa O(log n), qualquer que seja o tamanho da janela.
+# Em disco, cada movimentação é um registro de tamanho fixo acrescentado ao
+# fim de movimentacoes.bin.
+
+MOTIVOS_MOVIMENTACAO = ("cadastro", "ajuste", "pedido", "reposicao", "remocao")
+# Saídas que contam como consumo (a remoção do produto não conta)
+_MOTIVOS_CONSUMO = (MOTIVOS_MOVIMENTACAO.index("ajuste"), MOTIVOS_MOVIMENTACAO.index("pedido"))
+SEGUNDOS_POR_DIA = 86400
+
+# id, delta, instante, motivo
+_REG_MOVIMENTACAO = struct.Struct("<qqdB")
+
+historico = {"colunas": {}, "arquivo": None}
+
+
+def _novas_colunas():
+    return {
+        "instante": array("d"),
+        "delta": array("q"),
+        "motivo": array("B"),
+        "consumo": array("q")
+    }
+
+
+def _acrescentar_movimentacao(colunas: dict, identif: int, delta: int,
+                              instante: float, codigo_motivo: int):
+    """Acrescenta uma movimentação às colunas do produto."""
+    col = colunas.get(identif)
+    if col is None:
+        col = colunas[identif] = _novas_colunas()
+
+    if col["instante"] and instante < col["instante"][-1]:
+        instante = col["instante"][-1]  # relógio voltou: mantém a ordem
+    consumo_anterior = col["consumo"][-1] if col["consumo"] else 0
+
+    col["instante"].append(instante)
+    col["delta"].append(delta)
+    col["motivo"].append(codigo_motivo)
+    consumido = -delta if delta < 0 and codigo_motivo in _MOTIVOS_CONSUMO else 0
+    col["consumo"].append(consumo_anterior + consumido)
+
+
+def registrar_movimentacao(identif: int, delta: int, motivo: str, instante: float = None):
+    """Registra uma movimentação de estoque no histórico da loja ativa."""
+    if delta == 0 and motivo != "cadastro":
+        return
+    if instante is None:
+        instante = time.time()
+    codigo = MOTIVOS_MOVIMENTACAO.index(motivo)
+
+    _acrescentar_movimentacao(historico["colunas"], identif, delta, instante, codigo)
+    if historico["arquivo"] is not None:
+        # Entregue ao sistema operacional na hora, como as linhas do log do
+        # inventário: uma queda do programa não perde a movimentação
+        historico["arquivo"].write(_REG_MOVIMENTACAO.pack(identif, delta, instante, codigo))
+        historico["arquivo"].flush()
+
+
+def ler_historico(caminho: str = MOVIMENTACOES_FILE) -> dict:
+    """Lê o arquivo de movimentações e monta as colunas por produto."""
+    colunas = {}
+    if not os.path.exists(caminho):
+        return colunas
+
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    # Ignora um registro final incompleto (queda durante a escrita)
+    dados = dados[:len(dados) - len(dados) % _REG_MOVIMENTACAO.size]
+    for identif, delta, instante, codigo in _REG_MOVIMENTACAO.iter_unpack(dados):
+        _acrescentar_movimentacao(colunas, identif, delta, instante, codigo)
+    return colunas
+
+
+def abrir_historico(caminho: str, colunas: dict) -> dict:
+    """Retorna o histórico com o arquivo aberto para acrescentar registros."""
+    if os.path.exists(caminho):
+        # Remove um registro final incompleto, para os próximos ficarem alinhados
+        tamanho = os.path.getsize(caminho)
+        if tamanho % _REG_MOVIMENTACAO.size:
+            os.truncate(caminho, tamanho - tamanho % _REG_MOVIMENTACAO.size)
+    return {"colunas": colunas, "arquivo": open(caminho, "ab")}
+
+
+def sincronizar_historico(hist: dict):
+    """Garante que as movimentações registradas estão gravadas no disco (fsync)."""
+    if hist["arquivo"] is not None:
+        hist["arquivo"].flush()
+        os.fsync(hist["arquivo"].fileno())
+
+
+def _janela(col: dict, inicio: float, fim: float):
+    """Índices [lo, hi) das movimentações com inicio <= instante <= fim."""
+    lo = bisect.bisect_left(col["instante"], inicio)
+    hi = bisect.bisect_right(col["instante"], fim)
+    return lo, hi
+
+
+def consumo_no_periodo(identif: int, inicio: float, fim: float) -> int:
+    """Total de saídas do produto entre 'inicio' e 'fim' (timestamps), em O(log n)."""
+    col = historico["colunas"].get(identif)
+    if col is None:
+        return 0
+    lo, hi = _janela(col, inicio, fim)
+    if hi <= lo:
+        return 0
+    return col["consumo"][hi - 1] - (col["consumo"][lo - 1] if lo > 0 else 0)
+
+
+def taxa_consumo(identif: int, inicio: float = None, fim: float = None) -> float:
+    """
+    Consumo médio por dia do produto no período. Por padrão, do primeiro
+    registro do produto até agora.
+    """
+    col = historico["colunas"].get(identif)
+    if col is None:
+        return 0.0
+    if fim is None:
+        fim = time.time()
+    if inicio is None:
+        inicio = col["instante"][0]
+
+    dias = (fim - inicio) / SEGUNDOS_POR_DIA
+    if dias <= 0:
+        return 0.0
+    return consumo_no_periodo(identif, inicio, fim) / dias
+
+
+def media_movel_consumo(identif: int, janela_dias: float = 7, passo_dias: float = 1,
+                        inicio: float = None, fim: float = None):
+    """
+    Média móvel do consumo diário: para cada ponto, de 'inicio' até 'fim' a cada
+    'passo_dias', calcula o consumo por dia na janela de 'janela_dias' que
+    termina nele. Retorna lista de (instante, consumo por dia).
+    """
+    if janela_dias <= 0:
+        raise ValueError("A janela da média móvel deve ser maior que zero.")
+    if passo_dias <= 0:
+        raise ValueError("O passo da média móvel deve ser maior que zero.")
+
+    col = historico["colunas"].get(identif)
+    if col is None:
+        return []
+    if fim is None:
+        fim = time.time()
+    if inicio is None:
+        inicio = col["instante"][0]
+
+    janela = janela_dias * SEGUNDOS_POR_DIA
+    passo = passo_dias * SEGUNDOS_POR_DIA
+    pontos = []
+    instante = inicio
+    while instante <= fim:
+        pontos.append((instante, consumo_no_periodo(identif, instante - janela, instante) / janela_dias))
+        instante += passo
+    return pontos
+
+
+def previsao_reposicao(identif: int, janela_dias: float = 7):
+    """
+    Estima em quantos dias o produto chega ao estoque mínimo (ou a zero, se não
+    houver mínimo), usando o consumo médio dos últimos 'janela_dias'.
+    Retorna None se não houve consumo no período.
+    """
+    if identif not in inventario:
+        return None
+    agora = time.time()
+    taxa = taxa_consumo(identif, agora - janela_dias * SEGUNDOS_POR_DIA, agora)
+    if taxa <= 0:
+        return None
+    folga = inventario[identif]["quantidade"] - estoque_minimo.get(identif, 0)
+    return max(folga, 0) / taxa
+
+
+def movimentacoes_produto(identif: int, inicio: float = 0, fim: float = None):
+    """Lista as movimentações do produto no período, como dicionários."""
+    col = historico["colunas"].get(identif)
+    if col is None:
+        return []
+    if fim is None:
+        fim = time.time()
+    lo, hi = _janela(col, inicio, fim)
+    return [
+        {
+            "instante": col["instante"][i],
+            "delta": col["delta"][i],
+            "motivo": MOTIVOS_MOVIMENTACAO[col["motivo"][i]]
+        }
+        for i in range(lo, hi)
+    ]
+
+
+def relatorio_consumo(identif: int):
+    """Exibe consumo recente, média móvel e previsão de reposição de um produto."""
+    if identif not in inventario:
+        print("❌ Produto não encontrado.")
+        return
+
+    agora = time.time()
+    print(f"\n===== CONSUMO: {inventario[identif]['nome']} =====")
+    for dias in (1, 7, 30):
+        taxa = taxa_consumo(identif, agora - dias * SEGUNDOS_POR_DIA, agora)
+        print(f"Média diária ({dias} dia(s)): {taxa:.2f}")
+
+    print("Média móvel de 7 dias (últimos 7 dias):")
+    for instante, taxa in media_movel_consumo(identif, 7, 1, agora - 6 * SEGUNDOS_POR_DIA, agora):
+        dia = datetime.datetime.fromtimestamp(instante).strftime("%d/%m")
+        print(f"  {dia}: {taxa:.2f}")
+
+    dias_restantes = previsao_reposicao(identif)
+    if dias_restantes is None:
+        print("Previsão de reposição: sem consumo recente.")
+    else:
+        print(f"Previsão de reposição: em {dias_restantes:.1f} dia(s).")
+
+    print("Últimas movimentações:")
+    for mov in movimentacoes_produto(identif)[-5:]:
+        horario = datetime.datetime.fromtimestamp(mov["instante"]).strftime("%d/%m %H:%M")
+        print(f"  {horario} | {mov['delta']:+d} | {mov['motivo']}")
+    print()
+
+
+# ============================================================
+# CACHE DE CONSULTAS (LRU COM CONTROLE DE VERSÃO)
+# ============================================================
+
+# Cada tipo de dado ("inventario", "cardapio", "pedidos") tem um contador de
+# versão, incrementado por marcar_alteracao a cada mudança. As consultas
+# guardam o resultado com a versão na chave: depois de uma mudança a chave
+# antiga simplesmente não é mais procurada e acaba descartada pelo LRU.
+# O cache respeita CACHE_LIMITE_BYTES (tamanho aproximado via sys.getsizeof).
+
+_versoes = {"inventario": 0, "cardapio": 0, "pedidos": 0}
+_cache_consultas = OrderedDict()  # chave -> (valor, tamanho em bytes)
+_cache_bytes = 0
+_cache_contadores = {"acertos": 0, "faltas": 0, "descartes": 0}
+
+
+def marcar_alteracao(*tipos):
+    """Incrementa a versão dos tipos de dado alterados."""
+    for tipo in tipos:
+        _versoes[tipo] += 1
+
+
+def versao(tipo: str) -> int:
+    """Retorna a versão atual de um tipo de dado."""
+    return _versoes[tipo]
+
+
+def _tamanho_aproximado(valor) -> int:
+    """Estima a memória ocupada por listas, tuplas, dicionários e valores simples."""
+    tamanho = sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        for chave, item in valor.items():
+            tamanho += _tamanho_aproximado(chave) + _tamanho_aproximado(item)
+    elif isinstance(valor, (list, tuple)):
+        for item in valor:
+            tamanho += _tamanho_aproximado(item)
+    return tamanho
+
+
+def consultar_cache(chave, calcular):
+    """
+    Retorna o valor guardado para 'chave' ou, se não houver, chama calcular(),
+    guarda o resultado e descarta os itens usados há mais tempo até caber
+    no limite de memória.
+    """
+    global _cache_bytes
+
+    if chave in _cache_consultas:
+        _cache_consultas.move_to_end(chave)
+        _cache_contadores["acertos"] += 1
+        return _cache_consultas[chave][0]
+
+    _cache_contadores["faltas"] += 1
+    valor = calcular()
+    tamanho = _tamanho_aproximado(valor)
+    if tamanho > CACHE_LIMITE_BYTES:
+        return valor  # grande demais para o cache
+
+    _cache_consultas[chave] = (valor, tamanho)
+    _cache_bytes += tamanho
+    while _cache_bytes > CACHE_LIMITE_BYTES:
+        _, (_, tamanho_antigo) = _cache_consultas.popitem(last=False)
+        _cache_bytes -= tamanho_antigo
+        _cache_contadores["descartes"] += 1
+    return valor
+
+
+def limpar_cache():
+    """Esvazia o cache de consultas (os contadores são mantidos)."""
+    global _cache_bytes
+    _cache_consultas.clear()
+    _cache_bytes = 0
+
+
+def estatisticas_cache() -> dict:
+    """Retorna acertos, faltas, descartes, taxa de acerto e uso de memória do cache."""
+    consultas = _cache_contadores["acertos"] + _cache_contadores["faltas"]
+    return {
+        **_cache_contadores,
+        "taxa_acerto": _cache_contadores["acertos"] / consultas if consultas else 0.0,
+        "itens": len(_cache_consultas),
+        "bytes": _cache_bytes,
+        "limite_bytes": CACHE_LIMITE_BYTES
+    }
+
+
+def exibir_estatisticas_cache():
+    """Exibe os contadores do cache de consultas."""
+    est = estatisticas_cache()
+    print("===== CACHE DE CONSULTAS =====")
+    print(f"Acertos: {est['acertos']} | Faltas: {est['faltas']} | "
+          f"Taxa de acerto: {est['taxa_acerto'] * 100:.1f}%")
+    print(f"Itens: {est['itens']} | Descartes: {est['descartes']} | "
+          f"Memória: {est['bytes'] / 1024:.1f} de {est['limite_bytes'] / 1024:.0f} KiB")
+    print("==============================\n")
 
 
 # ============================================================
@@ -324,8 +1139,14 @@ def merge_sort(lista):
 def ordenar_inventario_por_nome():
     """
     Usa Insertion Sort se houver até 100 produtos,
-    senão, Merge Sort.
+    senão, Merge Sort. O resultado fica no cache até o inventário mudar,
+    por isso a lista retornada não deve ser alterada.
     """
+    chave = ("inventario_por_nome", versao("inventario"), id(inventario))
+    return consultar_cache(chave, _ordenar_inventario_por_nome)
+
+
+def _ordenar_inventario_por_nome():
     lista = inventario_para_lista()
     if len(lista) <= 100:
         return insertion_sort(lista)
@@ -369,17 +1190,17 @@ def busca_binaria_por_nome(nome: str):
 # CARDÁPIO E PEDIDOS (RESTAURANTE)
 # ============================================================
 
-def carregar_cardapio():
+def carregar_cardapio(caminho: str = CARDAPIO_FILE):
     """Carrega o cardápio do arquivo JSON."""
-    if not os.path.exists(CARDAPIO_FILE):
+    if not os.path.exists(caminho):
         return {}
-    with open(CARDAPIO_FILE, "r", encoding="utf-8") as f:
+    with open(caminho, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def salvar_cardapio(cardapio):
+def salvar_cardapio(cardapio, caminho: str = CARDAPIO_FILE):
     """Salva o cardápio em JSON."""
-    with open(CARDAPIO_FILE, "w", encoding="utf-8") as f:
+    with open(caminho, "w", encoding="utf-8") as f:
         json.dump(cardapio, f, ensure_ascii=False, indent=2)
 
 
@@ -389,13 +1210,23 @@ def listar_cardapio(cardapio):
         print("\nO cardápio ainda está vazio.\n")
         return
 
+    chave = ("cardapio_formatado", versao("cardapio"), id(cardapio))
+    linhas = consultar_cache(chave, lambda: _formatar_cardapio(cardapio))
+
     print("\n=========== CARDÁPIO ===========")
-    for id_prato, dados in cardapio.items():
-        print(f"ID {id_prato} - {dados['nome']} - R$ {dados['preco']:.2f}")
-        print("   Ingredientes:", ", ".join(dados["ingredientes"]))
+    print("\n".join(linhas))
     print("================================\n")
 
 
+def _formatar_cardapio(cardapio):
+    """Monta as linhas de exibição do cardápio."""
+    linhas = []
+    for id_prato, dados in cardapio.items():
+        linhas.append(f"ID {id_prato} - {dados['nome']} - R$ {dados['preco']:.2f}")
+        linhas.append("   Ingredientes: " + ", ".join(dados["ingredientes"]))
+    return linhas
+
+
 def adicionar_prato(cardapio, codigo, nome, preco, ingredientes):
     """Adiciona um novo prato ao cardápio."""
     cardapio[str(codigo)] = {
@@ -403,6 +1234,8 @@ def adicionar_prato(cardapio, codigo, nome, preco, ingredientes):
         "preco": preco,
         "ingredientes": ingredientes
     }
+    marcar_alteracao("cardapio")
+    _reindexar_prato(cardapio, str(codigo))
 
 
 def remover_prato(cardapio, codigo):
@@ -410,6 +1243,8 @@ def remover_prato(cardapio, codigo):
     codigo = str(codigo)
     if codigo in cardapio:
         del cardapio[codigo]
+        marcar_alteracao("cardapio")
+        _reindexar_prato(cardapio, codigo)
         return True
     return False
 
@@ -426,21 +1261,23 @@ def atualizar_prato(cardapio, codigo, nome=None, preco=None, ingredientes=None):
         cardapio[codigo]["preco"] = preco
     if ingredientes is not None:
         cardapio[codigo]["ingredientes"] = ingredientes
+        _reindexar_prato(cardapio, codigo)
 
+    marcar_alteracao("cardapio")
     return True
 
 
-def carregar_pedidos():
+def carregar_pedidos(caminho: str = PEDIDOS_FILE):
     """Carrega pedidos do JSON."""
-    if not os.path.exists(PEDIDOS_FILE):
+    if not os.path.exists(caminho):
         return []
-    with open(PEDIDOS_FILE, "r", encoding="utf-8") as f:
+    with open(caminho, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def salvar_pedidos(pedidos):
+def salvar_pedidos(pedidos, caminho: str = PEDIDOS_FILE):
     """Salva pedidos em JSON."""
-    with open(PEDIDOS_FILE, "w", encoding="utf-8") as f:
+    with open(caminho, "w", encoding="utf-8") as f:
         json.dump(pedidos, f, ensure_ascii=False, indent=2, default=str)
 
 
@@ -475,7 +1312,10 @@ def criar_pedido(cardapio, pedidos, id_prato, quantidade):
     for ing in prato["ingredientes"]:
         ing = ing.strip()
         id_prod = encontrar_id_por_nome(ing)
+        quantidade_anterior = inventario[id_prod]["quantidade"]
         inventario[id_prod]["quantidade"] -= quantidade
+        registrar_no_log("Q", id_prod, inventario[id_prod]["quantidade"])
+        _ao_alterar_estoque(id_prod, quantidade_anterior, "pedido")
 
     total = prato["preco"] * quantidade
 
@@ -488,6 +1328,7 @@ def criar_pedido(cardapio, pedidos, id_prato, quantidade):
     }
 
     pedidos.append(pedido)
+    marcar_alteracao("pedidos")
     return pedido
 
 
@@ -505,8 +1346,9 @@ def listar_pedidos(pedidos):
 
 
 def faturamento_total(pedidos):
-    """Retorna a soma total dos pedidos."""
-    return sum(p["total"] for p in pedidos)
+    """Retorna a soma total dos pedidos (com cache até surgir um novo pedido)."""
+    chave = ("faturamento", versao("pedidos"), id(pedidos))
+    return consultar_cache(chave, lambda: sum(p["total"] for p in pedidos))
 
 def exportar_cardapio_para_csv(cardapio, caminho_csv="cardapio.csv"):
     """
@@ -530,7 +1372,7 @@ def exportar_cardapio_para_csv(cardapio, caminho_csv="cardapio.csv"):
                 ingredientes_str
             ])
 
-    print(f"✔ Cardápio exportado para {caminho_csv}")
+    avisar(f"✔ Cardápio exportado para {caminho_csv}")
     
 def exportar_pedidos_para_csv(pedidos, caminho_csv="pedidos.csv"):
     """
@@ -553,7 +1395,786 @@ def exportar_pedidos_para_csv(pedidos, caminho_csv="pedidos.csv"):
                 p["horario"]
             ])
 
-    print(f"✔ Pedidos exportados para {caminho_csv}")
+    avisar(f"✔ Pedidos exportados para {caminho_csv}")
+
+
+# ============================================================
+# CAPACIDADE DE PRODUÇÃO (PORÇÕES DISPONÍVEIS POR PRATO)
+# ============================================================
+
+# Cada porção de um prato consome 1 unidade de cada ingrediente listado
+# (a mesma regra de criar_pedido). Estruturas do cache:
+# _porcoes_cache = { id_prato (str): porções possíveis (int) }
+# _pratos_por_ingrediente = { nome do ingrediente (minúsculo): {id_prato, ...} }
+# _ingredientes_do_prato = { id_prato (str): {nome do ingrediente (minúsculo): vezes} }
+# Só os pratos em _pratos_pendentes são recalculados na próxima consulta.
+
+_porcoes_cache = {}
+_pratos_por_ingrediente = {}
+_ingredientes_do_prato = {}
+_pratos_pendentes = set()
+_cardapio_indexado = None
+
+
+def _contar_ingredientes(prato):
+    """Retorna {nome do ingrediente (minúsculo): quantas vezes aparece no prato}."""
+    contagem = {}
+    for ing in prato["ingredientes"]:
+        ing = ing.strip().lower()
+        if ing:
+            contagem[ing] = contagem.get(ing, 0) + 1
+    return contagem
+
+
+def _reindexar_prato(cardapio, codigo):
+    """Atualiza o índice ingrediente -> pratos para um único prato alterado."""
+    if cardapio is not _cardapio_indexado:
+        return
+
+    for ing in _ingredientes_do_prato.pop(codigo, {}):
+        _pratos_por_ingrediente[ing].discard(codigo)
+
+    if codigo in cardapio:
+        contagem = _contar_ingredientes(cardapio[codigo])
+        _ingredientes_do_prato[codigo] = contagem
+        for ing in contagem:
+            _pratos_por_ingrediente.setdefault(ing, set()).add(codigo)
+        _pratos_pendentes.add(codigo)
+    else:
+        _porcoes_cache.pop(codigo, None)
+        _pratos_pendentes.discard(codigo)
+
+
+def _indexar_cardapio(cardapio):
+    """Monta o índice completo do cardápio e marca todos os pratos para cálculo."""
+    global _cardapio_indexado
+
+    _cardapio_indexado = cardapio
+    _porcoes_cache.clear()
+    _pratos_por_ingrediente.clear()
+    _ingredientes_do_prato.clear()
+    _pratos_pendentes.clear()
+    for codigo in cardapio:
+        _reindexar_prato(cardapio, codigo)
+
+
+def invalidar_porcoes_ingrediente(nome: str):
+    """Marca para recálculo apenas os pratos que usam o ingrediente informado."""
+    _pratos_pendentes.update(_pratos_por_ingrediente.get(nome.strip().lower(), ()))
+
+
+def invalidar_todas_porcoes():
+    """Marca todos os pratos indexados para recálculo (ex.: inventário recarregado)."""
+    _pratos_pendentes.update(_ingredientes_do_prato)
+
+
+def _porcoes_com_estoque(contagem, estoque, ids_por_nome):
+    """
+    Calcula quantas porções cabem em 'estoque' ({id: qtd}); None se não há ingredientes.
+    'ids_por_nome' é o mapa de mapa_ids_por_nome, montado uma vez por quem chama.
+    """
+    porcoes = None
+    for ing, vezes in contagem.items():
+        id_prod = ids_por_nome.get(ing)
+        if id_prod is None:
+            return 0
+        possivel = max(estoque.get(id_prod, 0), 0) // vezes
+        if porcoes is None or possivel < porcoes:
+            porcoes = possivel
+    return porcoes
+
+
+def porcoes_disponiveis(cardapio):
+    """
+    Retorna {id_prato: porções possíveis} considerando cada prato isoladamente.
+    Usa o cache e recalcula somente os pratos afetados desde a última consulta.
+    Pratos sem ingredientes aparecem com None (sem limite de estoque).
+    """
+    if cardapio is not _cardapio_indexado:
+        _indexar_cardapio(cardapio)
+
+    if _pratos_pendentes:
+        estoque = {identif: dados["quantidade"] for identif, dados in inventario.items()}
+        ids_por_nome = mapa_ids_por_nome()
+        for codigo in _pratos_pendentes:
+            _porcoes_cache[codigo] = _porcoes_com_estoque(
+                _ingredientes_do_prato[codigo], estoque, ids_por_nome)
+        _pratos_pendentes.clear()
+
+    return dict(_porcoes_cache)
+
+
+def planejar_producao(cardapio, prioridade=None, limites=None):
+    """
+    Planejamento conjunto: distribui o estoque compartilhado entre os pratos.
+    Percorre os pratos na ordem de 'prioridade' (padrão: maior preço primeiro)
+    e reserva o máximo possível de cada um, respeitando 'limites'
+    ({id_prato: porções desejadas}). Retorna o plano, o faturamento previsto
+    e as sobras de estoque.
+    """
+    if prioridade is None:
+        prioridade = sorted(cardapio, key=lambda c: cardapio[c]["preco"], reverse=True)
+    limites = limites or {}
+
+    estoque = {identif: dados["quantidade"] for identif, dados in inventario.items()}
+    ids_por_nome = mapa_ids_por_nome()
+    plano = {}
+    faturamento = 0.0
+
+    for codigo in prioridade:
+        codigo = str(codigo)
+        if codigo not in cardapio:
+            continue
+
+        contagem = _contar_ingredientes(cardapio[codigo])
+        porcoes = _porcoes_com_estoque(contagem, estoque, ids_por_nome)
+        if porcoes is None:
+            porcoes = limites.get(codigo, 0)
+        elif codigo in limites:
+            porcoes = min(porcoes, limites[codigo])
+
+        if porcoes <= 0:
+            continue
+
+        for ing, vezes in contagem.items():
+            estoque[ids_por_nome[ing]] -= porcoes * vezes
+        plano[codigo] = porcoes
+        faturamento += porcoes * cardapio[codigo]["preco"]
+
+    return {"plano": plano, "faturamento": faturamento, "sobras": estoque}
+
+
+def listar_porcoes_disponiveis(cardapio):
+    """Exibe quantas porções de cada prato podem ser feitas com o estoque atual."""
+    if not cardapio:
+        print("\nO cardápio ainda está vazio.\n")
+        return
+
+    porcoes = porcoes_disponiveis(cardapio)
+    print("\n======= PORÇÕES DISPONÍVEIS =======")
+    for codigo, dados in cardapio.items():
+        qtd = porcoes[codigo]
+        texto = "sem limite de estoque" if qtd is None else f"{qtd} porção(ões)"
+        print(f"ID {codigo} - {dados['nome']}: {texto}")
+    print("===================================\n")
+
+
+def exibir_planejamento(cardapio):
+    """Exibe o planejamento conjunto de produção com o estoque atual."""
+    if not cardapio:
+        print("\nO cardápio ainda está vazio.\n")
+        return
+
+    resultado = planejar_producao(cardapio)
+    print("\n===== PLANEJAMENTO DE PRODUÇÃO =====")
+    if not resultado["plano"]:
+        print("Nenhum prato pode ser produzido com o estoque atual.")
+    for codigo, qtd in resultado["plano"].items():
+        print(f"ID {codigo} - {cardapio[codigo]['nome']}: {qtd} porção(ões)")
+    print(f"Faturamento previsto: R$ {resultado['faturamento']:.2f}")
+    print("====================================\n")
+
+
+# ============================================================
+# SNAPSHOT BINÁRIO (INICIALIZAÇÃO RÁPIDA)
+# ============================================================
+
+# Formato do arquivo (little-endian):
+#   cabeçalho | produtos | pratos | pedidos | tabela de strings
+#
+# Produtos, pratos e pedidos são registros de tamanho fixo (struct), então o
+# registro i está em uma posição calculável. Os produtos ficam ordenados por
+# ID, permitindo busca binária direto no arquivo via mmap, sem decodificar tudo.
+# Textos ficam na tabela de strings (sem repetição) e são referenciados por
+# (posição, tamanho). A tabela é gravada cifrada com cifrar(), como o CSV.
+# Ingredientes de um prato são unidos por SEPARADOR_INGREDIENTES.
+#
+# Como a Cifra de César só desloca letras ASCII (bytes < 0x80), cifrar o texto
+# UTF-8 equivale a traduzir os bytes com bytes.translate, feito em C de uma vez.
+
+SNAPSHOT_MAGICO = b"INVS"
+SNAPSHOT_VERSAO = 1
+SEPARADOR_INGREDIENTES = "\x1f"
+
+# mágico, versão, nº produtos, nº pratos, nº pedidos, tamanho da tabela de strings
+_CABECALHO = struct.Struct("<4sHIIII")
+# id, nome (pos, tam), quantidade, preço, importado
+_REG_PRODUTO = struct.Struct("<qIIqd?")
+# código (pos, tam), nome (pos, tam), preço, ingredientes (pos, tam)
+_REG_PRATO = struct.Struct("<IIIIdII")
+# id, prato (pos, tam), quantidade, total, horário (pos, tam)
+_REG_PEDIDO = struct.Struct("<qIIqdII")
+
+_LETRAS = string.ascii_uppercase + string.ascii_lowercase
+_CIFRADAS = "".join(cifrar(c) for c in _LETRAS)
+_TRADUCAO_CIFRAR = bytes.maketrans(_LETRAS.encode(), _CIFRADAS.encode())
+_TRADUCAO_DECIFRAR = bytes.maketrans(_CIFRADAS.encode(), _LETRAS.encode())
+
+
+def salvar_snapshot(caminho: str = SNAPSHOT_FILE, itens: dict = None,
+                    cardapio: dict = None, pedidos: list = None):
+    """Grava inventário, cardápio e pedidos no formato binário do snapshot."""
+    if itens is None:
+        itens = inventario
+    cardapio = cardapio or {}
+    pedidos = pedidos or []
+
+    tabela = bytearray()
+    posicoes = {}
+
+    def referencia(texto):
+        texto = str(texto)
+        if texto not in posicoes:
+            dados = texto.encode("utf-8").translate(_TRADUCAO_CIFRAR)
+            posicoes[texto] = (len(tabela), len(dados))
+            tabela.extend(dados)
+        return posicoes[texto]
+
+    registros = bytearray()
+    for identif in sorted(itens):
+        dados = itens[identif]
+        registros += _REG_PRODUTO.pack(identif, *referencia(dados["nome"]),
+                                       dados["quantidade"], dados["preco"],
+                                       dados["importado"])
+    for codigo, dados in cardapio.items():
+        ingredientes = SEPARADOR_INGREDIENTES.join(dados["ingredientes"])
+        registros += _REG_PRATO.pack(*referencia(codigo), *referencia(dados["nome"]),
+                                     dados["preco"], *referencia(ingredientes))
+    for p in pedidos:
+        registros += _REG_PEDIDO.pack(p["id"], *referencia(p["prato"]),
+                                      p["quantidade"], p["total"],
+                                      *referencia(p["horario"]))
+
+    cabecalho = _CABECALHO.pack(SNAPSHOT_MAGICO, SNAPSHOT_VERSAO, len(itens),
+                                len(cardapio), len(pedidos), len(tabela))
+    # Grava num temporário e troca de uma vez: uma gravação interrompida
+    # nunca deixa um snapshot truncado no lugar do anterior
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as f:
+        f.write(cabecalho)
+        f.write(registros)
+        f.write(tabela)
+        f.flush()
+        os.fsync(f.fileno())
+    substituir_arquivo(temporario, caminho)
+
+
+def abrir_snapshot(caminho: str = SNAPSHOT_FILE) -> dict:
+    """
+    Mapeia o snapshot em memória (mmap) e lê apenas o cabeçalho.
+    Retorna um dicionário usado pelas demais funções; feche com fechar_snapshot.
+    """
+    with open(caminho, "rb") as f:
+        mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mapa) < _CABECALHO.size:
+        mapa.close()
+        raise ValueError(f"Arquivo '{caminho}' não é um snapshot válido.")
+
+    magico, versao, n_prod, n_pratos, n_pedidos, tam_tabela = _CABECALHO.unpack_from(mapa, 0)
+    if magico != SNAPSHOT_MAGICO or versao != SNAPSHOT_VERSAO:
+        mapa.close()
+        raise ValueError(f"Arquivo '{caminho}' não é um snapshot válido.")
+
+    inicio_produtos = _CABECALHO.size
+    inicio_pratos = inicio_produtos + n_prod * _REG_PRODUTO.size
+    inicio_pedidos = inicio_pratos + n_pratos * _REG_PRATO.size
+    inicio_tabela = inicio_pedidos + n_pedidos * _REG_PEDIDO.size
+    if len(mapa) != inicio_tabela + tam_tabela:
+        mapa.close()
+        raise ValueError(f"Snapshot '{caminho}' incompleto ou corrompido.")
+    return {
+        "mmap": mapa,
+        "produtos": n_prod,
+        "pratos": n_pratos,
+        "pedidos": n_pedidos,
+        "inicio_produtos": inicio_produtos,
+        "inicio_pratos": inicio_pratos,
+        "inicio_pedidos": inicio_pedidos,
+        "inicio_tabela": inicio_tabela
+    }
+
+
+def fechar_snapshot(snap: dict):
+    """Libera o mmap de um snapshot aberto."""
+    snap["mmap"].close()
+
+
+def _texto_snapshot(snap: dict, posicao: int, tamanho: int) -> str:
+    """Lê e decifra um texto da tabela de strings."""
+    inicio = snap["inicio_tabela"] + posicao
+    return snap["mmap"][inicio:inicio + tamanho].translate(_TRADUCAO_DECIFRAR).decode("utf-8")
+
+
+def _produto_snapshot(snap: dict, indice: int):
+    """Decodifica o produto de índice 'indice'. Retorna (id, dados)."""
+    identif, pos, tam, qtd, preco, importado = _REG_PRODUTO.unpack_from(
+        snap["mmap"], snap["inicio_produtos"] + indice * _REG_PRODUTO.size)
+    return identif, {
+        "nome": _texto_snapshot(snap, pos, tam),
+        "quantidade": qtd,
+        "preco": preco,
+        "importado": importado
+    }
+
+
+def buscar_produto_snapshot(snap: dict, identif: int):
+    """
+    Busca binária de um produto pelo ID direto no arquivo mapeado.
+    Decodifica só os IDs visitados e o produto encontrado (O(log N)).
+    Retorna o dicionário do produto (com 'id') ou None.
+    """
+    inicio, fim = 0, snap["produtos"] - 1
+    while inicio <= fim:
+        meio = (inicio + fim) // 2
+        atual = struct.unpack_from(
+            "<q", snap["mmap"], snap["inicio_produtos"] + meio * _REG_PRODUTO.size)[0]
+        if atual == identif:
+            _, dados = _produto_snapshot(snap, meio)
+            return {"id": identif, **dados}
+        elif atual < identif:
+            inicio = meio + 1
+        else:
+            fim = meio - 1
+    return None
+
+
+def carregar_snapshot(caminho: str = SNAPSHOT_FILE):
+    """Decodifica o snapshot inteiro. Retorna (inventario, cardapio, pedidos)."""
+    snap = abrir_snapshot(caminho)
+    try:
+        mapa = snap["mmap"]
+        # Decifra a tabela de strings inteira de uma vez; textos repetidos são
+        # decodificados uma única vez
+        tabela = mapa[snap["inicio_tabela"]:].translate(_TRADUCAO_DECIFRAR)
+        textos = {}
+
+        def texto(posicao, tamanho):
+            if posicao not in textos:
+                textos[posicao] = tabela[posicao:posicao + tamanho].decode("utf-8")
+            return textos[posicao]
+
+        itens = {}
+        for identif, pos, tam, qtd, preco, importado in _REG_PRODUTO.iter_unpack(
+                mapa[snap["inicio_produtos"]:snap["inicio_pratos"]]):
+            itens[identif] = {
+                "nome": texto(pos, tam),
+                "quantidade": qtd,
+                "preco": preco,
+                "importado": importado
+            }
+
+        cardapio = {}
+        for pos_c, tam_c, pos_n, tam_n, preco, pos_i, tam_i in _REG_PRATO.iter_unpack(
+                mapa[snap["inicio_pratos"]:snap["inicio_pedidos"]]):
+            ingredientes = texto(pos_i, tam_i)
+            cardapio[texto(pos_c, tam_c)] = {
+                "nome": texto(pos_n, tam_n),
+                "preco": preco,
+                "ingredientes": ingredientes.split(SEPARADOR_INGREDIENTES) if ingredientes else []
+            }
+
+        pedidos = []
+        for identif, pos_p, tam_p, qtd, total, pos_h, tam_h in _REG_PEDIDO.iter_unpack(
+                mapa[snap["inicio_pedidos"]:snap["inicio_tabela"]]):
+            pedidos.append({
+                "id": identif,
+                "prato": texto(pos_p, tam_p),
+                "quantidade": qtd,
+                "total": total,
+                "horario": texto(pos_h, tam_h)
+            })
+    finally:
+        fechar_snapshot(snap)
+
+    return itens, cardapio, pedidos
+
+
+def converter_para_snapshot(nome_loja: str = LOJA_PRINCIPAL):
+    """Gera o snapshot de uma loja a partir dos arquivos CSV/JSON atuais."""
+    caminhos = caminhos_loja(nome_loja)
+    salvar_snapshot(caminhos["snapshot"],
+                    ler_inventario(caminhos["inventario"]),
+                    carregar_cardapio(caminhos["cardapio"]),
+                    carregar_pedidos(caminhos["pedidos"]))
+    print(f"✔ Snapshot gerado em {caminhos['snapshot']}")
+
+
+def converter_snapshot_para_arquivos(nome_loja: str = LOJA_PRINCIPAL):
+    """Regrava o CSV do inventário e os JSON de cardápio e pedidos a partir do snapshot."""
+    caminhos = caminhos_loja(nome_loja)
+    itens, cardapio, pedidos = carregar_snapshot(caminhos["snapshot"])
+    salvar_inventario(caminhos["inventario"], itens)
+    salvar_cardapio(cardapio, caminhos["cardapio"])
+    salvar_pedidos(pedidos, caminhos["pedidos"])
+    print(f"✔ Arquivos da loja '{nome_loja}' recriados a partir do snapshot.")
+
+
+# ============================================================
+# ENTRADA E SAÍDA EM PARALELO (CARGA E GRAVAÇÃO DOS ARQUIVOS)
+# ============================================================
+
+# As cargas e gravações de arquivos diferentes são independentes, então rodam
+# ao mesmo tempo num pool de threads: o tempo total passa a ser o do arquivo
+# mais lento, e não a soma de todos. Com IO_PARALELO = False (ou se o pool
+# não puder ser criado) as tarefas rodam uma após a outra.
+
+# Mensagens das tarefas de E/S: cada thread guarda as suas e quem chamou
+# executar_tarefas_io as exibe depois, na ordem das tarefas, para que as
+# linhas de tarefas diferentes não saiam misturadas
+_saida_tarefas = threading.local()
+
+
+def avisar(texto: str):
+    """Exibe a mensagem, ou a guarda se estiver dentro de uma tarefa de E/S."""
+    mensagens = getattr(_saida_tarefas, "mensagens", None)
+    if mensagens is None:
+        print(texto)
+    else:
+        mensagens.append(texto)
+
+
+def _cronometrar(funcao, args):
+    """Executa funcao(*args) e retorna (resultado, segundos, mensagens)."""
+    _saida_tarefas.mensagens = []
+    try:
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        return resultado, time.perf_counter() - inicio, _saida_tarefas.mensagens
+    finally:
+        _saida_tarefas.mensagens = None
+
+
+def exibir_tempos_io(tempos: dict, total: float, paralelo: bool):
+    """Exibe o tempo de cada arquivo e o tempo total da etapa de E/S."""
+    modo = "paralelo" if paralelo else "sequencial"
+    print(f"\n--- Tempos de E/S ({modo}) ---")
+    for rotulo, segundos in tempos.items():
+        print(f"{rotulo}: {segundos * 1000:.1f} ms")
+    print(f"Total: {total * 1000:.1f} ms\n")
+
+
+def executar_tarefas_io(tarefas, paralelo: bool = None, mostrar_tempos: bool = True) -> dict:
+    """
+    Executa tarefas de E/S independentes, dadas como (rótulo, função, argumentos).
+    Retorna {rótulo: resultado}. Exceções das tarefas são repassadas a quem chamou.
+    As mensagens das tarefas (ver avisar) são exibidas no fim, na ordem das tarefas.
+    """
+    if paralelo is None:
+        paralelo = IO_PARALELO
+
+    inicio = time.perf_counter()
+    paralelo = paralelo and len(tarefas) > 1
+    pool = None
+    futuros = []
+
+    # Só a criação do pool e o envio das tarefas caem no modo sequencial;
+    # erros das próprias tarefas sobem normalmente em futuro.result()
+    if paralelo:
+        try:
+            pool = ThreadPoolExecutor(max_workers=len(tarefas))
+            for rotulo, funcao, args in tarefas:
+                futuros.append((rotulo, pool.submit(_cronometrar, funcao, args)))
+        except RuntimeError as e:
+            print(f"E/S paralela indisponível ({e}). Usando modo sequencial...")
+            paralelo = False
+
+    try:
+        saidas = [(rotulo, futuro.result()) for rotulo, futuro in futuros]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Tarefas que não chegaram a ser enviadas ao pool rodam em série
+    saidas += [(rotulo, _cronometrar(funcao, args))
+               for rotulo, funcao, args in tarefas[len(futuros):]]
+
+    for _, (_, _, mensagens) in saidas:
+        for texto in mensagens:
+            print(texto)
+    resultados = {rotulo: resultado for rotulo, (resultado, _, _) in saidas}
+    tempos = {rotulo: segundos for rotulo, (_, segundos, _) in saidas}
+    if mostrar_tempos:
+        exibir_tempos_io(tempos, time.perf_counter() - inicio, paralelo)
+    return resultados
+
+
+# ============================================================
+# MÚLTIPLAS LOJAS (ESTADO SEPARADO POR COZINHA)
+# ============================================================
+
+# Cada loja tem inventário, estoque mínimo, cardápio e pedidos próprios,
+# salvos em arquivos próprios. A loja principal usa os arquivos da raiz
+# (o mesmo fluxo de sempre); as demais ficam em lojas/<nome>/.
+#
+# lojas = {
+#   nome (str): {
+#       "inventario": dict,
+#       "estoque_minimo": dict,
+#       "cardapio": dict,
+#       "pedidos": list,
+#       "log": dict  (log de alterações do inventário, ver abrir_log_inventario),
+#       "historico": dict  (movimentações de estoque, ver abrir_historico)
+#   },
+#   ...
+# }
+#
+# Apenas a loja ativa fica ligada às variáveis globais 'inventario',
+# 'estoque_minimo' e 'historico', usadas pelas funções de inventário,
+# reposição e histórico.
+
+lojas = {}
+loja_atual = LOJA_PRINCIPAL
+
+
+def caminhos_loja(nome: str) -> dict:
+    """Retorna os caminhos dos arquivos de uma loja."""
+    if nome == LOJA_PRINCIPAL:
+        pasta = ""
+    else:
+        pasta = os.path.join(LOJAS_DIR, nome)
+    return {
+        "inventario": os.path.join(pasta, ARQUIVO_INVENTARIO),
+        "estoque_minimo": os.path.join(pasta, ESTOQUE_MINIMO_FILE),
+        "cardapio": os.path.join(pasta, CARDAPIO_FILE),
+        "pedidos": os.path.join(pasta, PEDIDOS_FILE),
+        "cardapio_csv": os.path.join(pasta, "cardapio.csv"),
+        "pedidos_csv": os.path.join(pasta, "pedidos.csv"),
+        "snapshot": os.path.join(pasta, SNAPSHOT_FILE),
+        "movimentacoes": os.path.join(pasta, MOVIMENTACOES_FILE),
+        "log_inventario": os.path.join(pasta, LOG_INVENTARIO_FILE)
+    }
+
+
+def listar_lojas():
+    """Retorna a loja principal seguida das lojas existentes em disco ou em memória."""
+    nomes = set(lojas)
+    if os.path.isdir(LOJAS_DIR):
+        for nome in os.listdir(LOJAS_DIR):
+            if os.path.isdir(os.path.join(LOJAS_DIR, nome)):
+                nomes.add(nome)
+    nomes.discard(LOJA_PRINCIPAL)
+    return [LOJA_PRINCIPAL] + sorted(nomes)
+
+
+def criar_loja(nome: str) -> bool:
+    """Cria a pasta de uma nova loja."""
+    nome = nome.strip()
+    if (not nome or nome in (LOJA_PRINCIPAL, ".", "..")
+            or os.sep in nome or "/" in nome):
+        print("❌ Nome de loja inválido.")
+        return False
+    if nome in listar_lojas():
+        print("❌ Já existe uma loja com esse nome.")
+        return False
+
+    try:
+        os.makedirs(os.path.join(LOJAS_DIR, nome))
+    except (OSError, ValueError):
+        print("❌ Nome de loja inválido.")
+        return False
+    print(f"✔ Loja '{nome}' criada.")
+    return True
+
+
+def carregar_loja(nome: str):
+    """
+    Carrega os arquivos de uma loja (em paralelo, ver executar_tarefas_io),
+    torna-a a loja ativa e retorna (cardapio, pedidos).
+    """
+    global inventario, estoque_minimo, historico, loja_atual
+
+    caminhos = caminhos_loja(nome)
+    usa_snapshot = USAR_SNAPSHOT and os.path.exists(caminhos["snapshot"])
+
+    if usa_snapshot:
+        try:
+            dados = executar_tarefas_io([
+                ("snapshot", carregar_snapshot, (caminhos["snapshot"],)),
+                ("estoque mínimo", ler_estoque_minimo, (caminhos["estoque_minimo"],)),
+                ("movimentações", ler_historico, (caminhos["movimentacoes"],))
+            ])
+            dados["inventário"], dados["cardápio"], dados["pedidos"] = dados["snapshot"]
+        except (ValueError, struct.error) as e:
+            print(f"❌ Snapshot inválido ({e}). Carregando CSV/JSON...")
+            usa_snapshot = False
+
+    if not usa_snapshot:
+        dados = executar_tarefas_io([
+            ("inventário", ler_inventario, (caminhos["inventario"],)),
+            ("estoque mínimo", ler_estoque_minimo, (caminhos["estoque_minimo"],)),
+            ("cardápio", carregar_cardapio, (caminhos["cardapio"],)),
+            ("pedidos", carregar_pedidos, (caminhos["pedidos"],)),
+            ("movimentações", ler_historico, (caminhos["movimentacoes"],))
+        ])
+
+    if usa_snapshot:
+        print("✔ Inventário carregado do snapshot binário.")
+    elif os.path.exists(caminhos["inventario"]):
+        print("✔ Inventário carregado com sucesso.")
+    else:
+        print("Arquivo de inventário não encontrado. Criando vazio...")
+
+    # Alterações feitas depois do último checkpoint
+    recuperadas = reproduzir_log(caminhos["log_inventario"], dados["inventário"])
+
+    # Dicionários novos, para não sobrescrever o estado de outra loja
+    inventario = dados["inventário"]
+    estoque_minimo = dados["estoque mínimo"]
+    historico = abrir_historico(caminhos["movimentacoes"], dados["movimentações"])
+    marcar_alteracao("inventario", "cardapio", "pedidos")
+    reconstruir_fila_reposicao()
+    invalidar_todas_porcoes()
+
+    lojas[nome] = {
+        "inventario": inventario,
+        "estoque_minimo": estoque_minimo,
+        "cardapio": dados["cardápio"],
+        "pedidos": dados["pedidos"],
+        "log": abrir_log_inventario(caminhos["log_inventario"], recuperadas),
+        "historico": historico
+    }
+    loja_atual = nome
+    return lojas[nome]["cardapio"], lojas[nome]["pedidos"]
+
+
+def ativar_loja(nome: str):
+    """Torna uma loja a ativa (carregando-a se preciso) e retorna (cardapio, pedidos)."""
+    global inventario, estoque_minimo, historico, loja_atual
+
+    if nome not in lojas:
+        return carregar_loja(nome)
+
+    estado = lojas[nome]
+    inventario = estado["inventario"]
+    estoque_minimo = estado["estoque_minimo"]
+    historico = estado["historico"]
+    loja_atual = nome
+    marcar_alteracao("inventario", "cardapio", "pedidos")
+    reconstruir_fila_reposicao()
+    invalidar_todas_porcoes()
+    return estado["cardapio"], estado["pedidos"]
+
+
+def _tarefas_salvar_loja(nome: str):
+    """Monta as tarefas de gravação (rótulo, função, argumentos) de uma loja."""
+    estado = lojas[nome]
+    caminhos = caminhos_loja(nome)
+    prefixo = "" if len(lojas) == 1 else f"{nome}: "
+    tarefas = [
+        (prefixo + "inventário", salvar_inventario_da_loja, (nome,)),
+        (prefixo + "estoque mínimo", salvar_estoque_minimo,
+         (caminhos["estoque_minimo"], estado["estoque_minimo"])),
+        (prefixo + "movimentações", sincronizar_historico, (estado["historico"],)),
+        (prefixo + "cardápio", salvar_cardapio, (estado["cardapio"], caminhos["cardapio"])),
+        (prefixo + "pedidos", salvar_pedidos, (estado["pedidos"], caminhos["pedidos"])),
+        (prefixo + "cardápio csv", exportar_cardapio_para_csv,
+         (estado["cardapio"], caminhos["cardapio_csv"])),
+        (prefixo + "pedidos csv", exportar_pedidos_para_csv,
+         (estado["pedidos"], caminhos["pedidos_csv"]))
+    ]
+    return tarefas
+
+
+def salvar_todas_lojas():
+    """Salva todas as lojas carregadas nesta execução, num único lote paralelo."""
+    tarefas = []
+    for nome in lojas:
+        tarefas.extend(_tarefas_salvar_loja(nome))
+    executar_tarefas_io(tarefas)
+
+
+def _ler_estado_loja(caminhos: dict, usar_snapshot: bool):
+    """
+    Reconstrói inventário e pedidos de uma loja não carregada do mesmo jeito
+    que carregar_loja: snapshot (se habilitado e válido) ou CSV/JSON, com o
+    log de alterações reaplicado por cima. Retorna (inventario, pedidos).
+    """
+    itens = pedidos = None
+    if usar_snapshot and os.path.exists(caminhos["snapshot"]):
+        try:
+            itens, _, pedidos = carregar_snapshot(caminhos["snapshot"])
+        except (ValueError, struct.error):
+            itens = pedidos = None
+
+    if itens is None:
+        itens = ler_inventario(caminhos["inventario"], paralelo=False)
+        pedidos = carregar_pedidos(caminhos["pedidos"])
+
+    reproduzir_log(caminhos["log_inventario"], itens, mostrar=False)
+    return itens, pedidos
+
+
+def _resumo_loja(nome: str, itens: dict, pedidos: list) -> dict:
+    """Calcula o resumo (estoque e faturamento) de uma loja."""
+    return {
+        "loja": nome,
+        "produtos": len(itens),
+        "valor_estoque": sum(d["quantidade"] * d["preco"] for d in itens.values()),
+        "pedidos": len(pedidos),
+        "faturamento": sum(p["total"] for p in pedidos)
+    }
+
+
+def _resumo_loja_do_disco(tarefa) -> dict:
+    """
+    Lê uma loja não carregada e calcula o seu resumo. Roda em processo
+    separado, por isso não usa variáveis globais: recebe (nome, caminhos, usar_snapshot).
+    """
+    nome, caminhos, usar_snapshot = tarefa
+    itens, pedidos = _ler_estado_loja(caminhos, usar_snapshot)
+    return _resumo_loja(nome, itens, pedidos)
+
+
+def relatorio_consolidado():
+    """
+    Calcula o resumo de todas as lojas. As já carregadas são somadas aqui mesmo,
+    a partir do estado em memória; só as que precisam ser lidas do disco vão
+    para o pool de processos. Com uma loja a ler, ou se o pool falhar, roda em série.
+    """
+    nomes = listar_lojas()
+    resumos = {}
+    tarefas = []
+    for nome in nomes:
+        estado = lojas.get(nome)
+        if estado is not None:
+            resumos[nome] = _resumo_loja(nome, estado["inventario"], estado["pedidos"])
+        else:
+            tarefas.append((nome, caminhos_loja(nome), USAR_SNAPSHOT))
+
+    lidos = None
+    if len(tarefas) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(len(tarefas), os.cpu_count() or 1),
+                                     mp_context=contexto_processos()) as pool:
+                lidos = list(pool.map(_resumo_loja_do_disco, tarefas))
+        except (OSError, RuntimeError) as e:
+            print(f"Processamento paralelo indisponível ({e}). Calculando em série...")
+    if lidos is None:
+        lidos = [_resumo_loja_do_disco(t) for t in tarefas]
+
+    for resumo in lidos:
+        resumos[resumo["loja"]] = resumo
+    return [resumos[nome] for nome in nomes]
+
+
+def exibir_relatorio_consolidado():
+    """Exibe estoque e faturamento por loja e o total da rede."""
+    resumos = relatorio_consolidado()
+
+    print("\n===== RELATÓRIO CONSOLIDADO DAS LOJAS =====")
+    for r in resumos:
+        print(
+            f"{r['loja']}: {r['produtos']} produto(s) | "
+            f"Estoque: R$ {r['valor_estoque']:.2f} | "
+            f"{r['pedidos']} pedido(s) | "
+            f"Faturamento: R$ {r['faturamento']:.2f}"
+        )
+    print("-------------------------------------------")
+    print(f"Valor total em estoque: R$ {sum(r['valor_estoque'] for r in resumos):.2f}")
+    print(f"Faturamento total: R$ {sum(r['faturamento'] for r in resumos):.2f}")
+    print("===========================================\n")
+
 
 # ============================================================
 # FUNÇÕES DE INTERFACE (MENUS)
@@ -641,6 +2262,11 @@ def menu_inventario():
         print("7 - Buscar Produto por Nome (Binária)")
         print("8 - Buscar Produto por ID")
         print("9 - Estatísticas do Inventário")
+        print("10 - Definir Estoque Mínimo")
+        print("11 - Relatório de Reposição")
+        print("12 - Checkpoint do Log de Alterações")
+        print("13 - Repor Estoque")
+        print("14 - Consumo e Previsão de Reposição")
         print("0 - Voltar")
         op = input("Escolha: ").strip()
 
@@ -743,6 +2369,42 @@ def menu_inventario():
             estatisticas_inventario()
             input("Enter...")
 
+        elif op == "10":
+            try:
+                ident = int(input("ID do produto: "))
+                minimo = input("Estoque mínimo (ENTER p/ remover): ").strip()
+                minimo = int(minimo) if minimo != "" else None
+                if definir_estoque_minimo(ident, minimo):
+                    print("✔ Estoque mínimo atualizado.")
+            except ValueError:
+                print("❌ Valor inválido.")
+            input("Enter...")
+
+        elif op == "11":
+            relatorio_reposicao()
+            input("Enter...")
+
+        elif op == "12":
+            if loja_atual in lojas:
+                checkpoint_inventario()
+            input("Enter...")
+
+        elif op == "13":
+            try:
+                ident = int(input("ID do produto: "))
+                qtd = int(input("Quantidade recebida: "))
+                repor_produto(ident, qtd)
+            except ValueError:
+                print("❌ Valor inválido.")
+            input("Enter...")
+
+        elif op == "14":
+            try:
+                relatorio_consumo(int(input("ID do produto: ")))
+            except ValueError:
+                print("❌ ID inválido.")
+            input("Enter...")
+
         elif op == "0":
             break
 
@@ -758,6 +2420,8 @@ def menu_pedidos(cardapio, pedidos):
         print("1 - Criar Pedido")
         print("2 - Listar Pedidos")
         print("3 - Ver Faturamento Total")
+        print("4 - Porções Disponíveis por Prato")
+        print("5 - Planejar Produção Conjunta")
         print("0 - Voltar")
         op = input("Escolha: ").strip()
 
@@ -785,6 +2449,14 @@ def menu_pedidos(cardapio, pedidos):
             print(f"\nFaturamento total: R$ {total:.2f}")
             input("Enter...")
 
+        elif op == "4":
+            listar_porcoes_disponiveis(cardapio)
+            input("Enter...")
+
+        elif op == "5":
+            exibir_planejamento(cardapio)
+            input("Enter...")
+
         elif op == "0":
             break
         else:
@@ -799,18 +2471,67 @@ def menu_estatisticas_gerais(cardapio, pedidos):
     print(f"Total de pedidos: {len(pedidos)}")
     print(f"Faturamento acumulado: R$ {faturamento_total(pedidos):.2f}")
     estatisticas_inventario()
+    exibir_estatisticas_cache()
     input("Enter para voltar...")
 
 
+def menu_lojas(cardapio, pedidos):
+    """Menu de lojas. Retorna (cardapio, pedidos) da loja ativa ao sair."""
+    while True:
+        limpar_tela()
+        print("===== MENU DE LOJAS =====")
+        print(f"Loja ativa: {loja_atual}")
+        print("1 - Listar Lojas")
+        print("2 - Trocar de Loja")
+        print("3 - Criar Loja")
+        print("4 - Relatório Consolidado")
+        print("0 - Voltar")
+        op = input("Escolha: ").strip()
+
+        if op == "1":
+            print()
+            for nome in listar_lojas():
+                marcador = " (ativa)" if nome == loja_atual else ""
+                print(f"- {nome}{marcador}")
+            print()
+            input("Enter...")
+
+        elif op == "2":
+            nome = input("Nome da loja: ").strip()
+            if nome in listar_lojas():
+                cardapio, pedidos = ativar_loja(nome)
+                print(f"✔ Loja ativa: {nome}")
+            else:
+                print("❌ Loja não encontrada.")
+            input("Enter...")
+
+        elif op == "3":
+            criar_loja(input("Nome da nova loja: "))
+            input("Enter...")
+
+        elif op == "4":
+            exibir_relatorio_consolidado()
+            input("Enter...")
+
+        elif op == "0":
+            return cardapio, pedidos
+
+        else:
+            print("Opção inválida.")
+            input("Enter...")
+
+
 def menu_principal(cardapio, pedidos):
     while True:
         limpar_tela()
         print("===== SISTEMA DO RESTAURANTE =====")
+        print(f"Loja: {loja_atual}")
         print("1 - Cardápio")
         print("2 - Inventário")
         print("3 - Pedidos")
         print("4 - Estatísticas Gerais")
         print("5 - Alterar Usuário/Senha")
+        print("6 - Lojas")
         print("0 - Sair")
         op = input("Escolha: ").strip()
 
@@ -825,6 +2546,8 @@ def menu_principal(cardapio, pedidos):
         elif op == "5":
             editar_usuario_senha()
             input("Enter...")
+        elif op == "6":
+            cardapio, pedidos = menu_lojas(cardapio, pedidos)
         elif op == "0":
             print("Saindo...")
             break
@@ -847,23 +2570,18 @@ def main():
     if not login():
         return
 
-    # 3) Carregar dados (processamento em lote)
-    carregar_inventario()
-    cardapio = carregar_cardapio()
-    pedidos = carregar_pedidos()
+    # 3) Carregar dados da loja principal (processamento em lote)
+    cardapio, pedidos = carregar_loja(LOJA_PRINCIPAL)
 
     # 4) Menu principal
     menu_principal(cardapio, pedidos)
 
-    # 5) Ao sair do menu, salvar tudo (lote)
-    salvar_inventario()
-    salvar_cardapio(cardapio)
-    salvar_pedidos(pedidos)
-    
-    # 6) Salvar em csv
-    exportar_cardapio_para_csv(cardapio)
-    exportar_pedidos_para_csv(pedidos)
-    
+    # 5) Ao sair do menu, salvar tudo (lote) e exportar em csv,
+    #    para cada loja aberta nesta execução
+    salvar_todas_lojas()
+
     print("✔ Dados salvos. Até logo!")
 
-main()
+
+if __name__ == "__main__":
+    main()